@@ -0,0 +1,236 @@
+"""Command-line batch processing of moveset files, without the GUI.
+
+    python BatchTool.py decode   DIR [--dump OUT]     # parse, optionally dump JSON
+    python BatchTool.py validate DIR                  # report suspicious scripts
+    python BatchTool.py reencode DIR --output OUT     # write re-encoded copies
+    python BatchTool.py reencode DIR --verify         # check round trips, write nothing
+    python BatchTool.py transform DIR --command HITBOX --where EXPR --set "field = EXPR"
+    python BatchTool.py simulate DIR [--max-frames N]  # hitbox/intangibility timelines
+
+Every *.bin under DIR is handled by a process pool (one worker per CPU by
+default). Per-file results come back to the parent, which prints one JSON
+report and exits non-zero if any file failed, did not validate or (reencode
+--verify) would change when re-encoded.
+"""
+import argparse
+import json
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import Command
+import Simulator
+import Transform
+
+
+_TERMINATORS = frozenset((Command.MOVESET_END, Command.GOTO, Command.RETURN))
+
+
+def FindMovesetFiles(root, pattern=".bin") -> list:
+    """Every file under `root` whose name ends in `pattern`, sorted."""
+    found = []
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            if name.lower().endswith(pattern):
+                found.append(os.path.join(dirpath, name))
+    found.sort()
+    return found
+
+
+def _parse(data):
+    """(commands, offsets, parsed_end) for a moveset buffer."""
+    commands = Command.ParseMoveset(data)
+    offsets, pos = [], 0
+    for comm in commands:
+        offsets.append(pos)
+        pos += comm.command_size // 2
+    return commands, offsets, pos
+
+
+def CommandToDict(comm, offset) -> dict:
+    return {
+        "offset": offset,
+        "command": type(comm).__name__,
+        "name": comm.command_name,
+        "fields": {name: value.value for name, value in comm.GetFields()},
+    }
+
+
+def ValidateMoveset(data) -> list:
+    """Problems that suggest a script is damaged or was mis-parsed, as short
+    human-readable strings. An empty list means the script looks sound."""
+    commands, offsets, parsed_end = _parse(data)
+    issues = []
+    for comm, offset in zip(commands, offsets):
+        if isinstance(comm, Command.UNKNOWN):
+            issues.append(f"unknown command {comm.command_name} at {offset:#x}")
+    if parsed_end < len(data):
+        issues.append(f"{len(data) - parsed_end} trailing bytes after the last complete command")
+    if not commands or type(commands[-1]) not in _TERMINATORS:
+        issues.append("script does not end with End, Goto or Return")
+    if Command.EncodeMoveset(commands) != data[:parsed_end]:
+        issues.append("re-encoding does not reproduce the file")
+    return issues
+
+
+# ── Workers ───────────────────────────────────────────────────────────────────
+# Each takes (path, options) and returns a JSON-able dict; they run in the
+# pool's worker processes, so they only depend on module-level state.
+
+def _decode_file(path, options):
+    with open(path, "rb") as f:
+        data = f.read()
+    commands, offsets, parsed_end = _parse(data)
+    result = {
+        "commands": len(commands),
+        "bytes": len(data),
+        "counts": dict(Counter(type(comm).__name__ for comm in commands)),
+    }
+    dump_dir = options.get("dump")
+    if dump_dir:
+        out_path = os.path.join(dump_dir, os.path.relpath(path, options["root"])) + ".json"
+        os.makedirs(os.path.dirname(out_path), exist_ok=True)
+        with open(out_path, "w") as f:
+            json.dump([CommandToDict(c, o) for c, o in zip(commands, offsets)], f, indent=1)
+        result["dump"] = out_path
+    return result
+
+
+def _validate_file(path, options):
+    with open(path, "rb") as f:
+        data = f.read()
+    return {"issues": ValidateMoveset(data)}
+
+
+def _reencode_file(path, options):
+    """Write the re-encoded file under options["output"], or with
+    options["verify"] only report whether re-encoding would change it."""
+    with open(path, "rb") as f:
+        data = f.read()
+    commands, _, parsed_end = _parse(data)
+    # Bytes that do not form a complete command are carried over unchanged.
+    out = Command.EncodeMoveset(commands) + data[parsed_end:]
+    changed = out != data
+    if options.get("verify"):
+        result = {"changed": changed}
+        if changed:
+            result["first_difference"] = next(i for i, (a, b) in enumerate(zip(out, data)) if a != b)
+        return result
+    out_path = os.path.join(options["output"], os.path.relpath(path, options["root"]))
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    with open(out_path, "wb") as f:
+        f.write(out)
+    return {"changed": changed, "output": out_path}
+
+
+_WORKERS = {
+    "decode": _decode_file,
+    "validate": _validate_file,
+    "reencode": _reencode_file,
+    "transform": Transform.TransformFile,
+    "simulate": Simulator.SimulateFile,
+}
+
+
+def _run_one(job):
+    action, path, options = job
+    try:
+        result = _WORKERS[action](path, options)
+        result["ok"] = True
+    except Exception as e:
+        result = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+    result["path"] = path
+    return result
+
+
+def RunBatch(action, paths, options=None, jobs=None, chunksize=None) -> list:
+    """Apply `action` (a key of _WORKERS) to every path and
+    return the per-file result dicts in input order.
+
+    Work is spread over `jobs` processes (default: CPU count) in chunks of
+    `chunksize` files, so small files do not pay one round trip each. With
+    jobs=1 everything runs in this process."""
+    options = options or {}
+    work = [(action, path, options) for path in paths]
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(work) <= 1:
+        return [_run_one(job) for job in work]
+    if chunksize is None:
+        chunksize = max(1, len(work) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(_run_one, work, chunksize=chunksize))
+
+
+def Summarize(action, results) -> dict:
+    failed = [r for r in results if not r["ok"]]
+    summary = {"action": action, "files": len(results), "failed": len(failed)}
+    if action == "decode":
+        totals = Counter()
+        for r in results:
+            totals.update(r.get("counts", {}))
+        summary["commands"] = sum(r.get("commands", 0) for r in results)
+        summary["counts"] = dict(totals.most_common())
+    elif action == "validate":
+        summary["invalid"] = sum(1 for r in results if r.get("issues"))
+    elif action == "reencode":
+        summary["changed"] = sum(1 for r in results if r.get("changed"))
+    elif action == "transform":
+        summary["matched"] = sum(r.get("matched", 0) for r in results)
+        summary["changed"] = sum(r.get("changed", 0) for r in results)
+        summary["files_changed"] = sum(1 for r in results if r.get("changed"))
+    elif action == "simulate":
+        summary["end_reasons"] = dict(Counter(r["end_reason"] for r in results if r["ok"]))
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Decode, validate, re-encode, transform or simulate moveset files in bulk.")
+    parser.add_argument("action", choices=sorted(_WORKERS))
+    parser.add_argument("root", help="directory searched recursively for .bin files")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunksize", type=int, default=None, help="files handed to a worker at a time")
+    parser.add_argument("--dump", help="decode: write each file's commands as JSON under this directory")
+    parser.add_argument("--output", help="reencode: write files under this directory")
+    parser.add_argument("--verify", action="store_true",
+                        help="reencode: write nothing, fail if any file would change")
+    parser.add_argument("--command", help="transform: command class to match, e.g. HITBOX")
+    parser.add_argument("--where", help="transform: predicate over the command's fields")
+    parser.add_argument("--set", dest="updates", action="append", default=[], metavar="FIELD=EXPR",
+                        help="transform: field update, may be repeated")
+    parser.add_argument("--dry-run", action="store_true", help="transform: count changes, write nothing")
+    parser.add_argument("--max-frames", type=int, default=1000, help="simulate: stop after this many frames")
+    parser.add_argument("--quiet", action="store_true", help="only print the summary")
+    args = parser.parse_args(argv)
+
+    if args.action == "reencode" and bool(args.output) == args.verify:
+        parser.error("reencode needs exactly one of --output or --verify")
+
+    options = {"root": args.root, "dump": args.dump, "output": args.output, "verify": args.verify,
+               "max_frames": args.max_frames}
+    if args.action == "transform":
+        if not args.command or not args.updates:
+            parser.error("transform needs --command and at least one --set")
+        try:
+            transform = Transform.FieldTransform(
+                args.command, args.where, tuple(Transform.ParseUpdate(u) for u in args.updates))
+            Transform.ApplyTransform([], transform)  # validate before starting workers
+        except (ValueError, SyntaxError) as e:
+            parser.error(str(e))
+        options.update(transform=transform, dry_run=args.dry_run)
+    paths = FindMovesetFiles(args.root)
+    results = RunBatch(args.action, paths, options, args.jobs, args.chunksize)
+
+    report = {"summary": Summarize(args.action, results)}
+    if not args.quiet:
+        report["files"] = results
+    print(json.dumps(report, indent=2))
+
+    summary = report["summary"]
+    if args.action == "reencode" and args.verify and summary["changed"]:
+        return 1
+    return 1 if summary["failed"] or summary.get("invalid") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
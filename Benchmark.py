@@ -0,0 +1,284 @@
+"""Throughput and peak-memory benchmarks for parsing, encoding and the GUI's
+rendering helpers, run over synthetic moveset scripts.
+
+    python Benchmark.py                          # 1k/10k/100k, JSON to stdout
+    python Benchmark.py -o new.json --compare old.json
+
+Each result row records wall time (best of --repeat runs), commands and
+megabytes per second, and the peak Python heap seen by tracemalloc during a
+separate run. Qt's own C++ allocations are not visible to tracemalloc. The
+tree, html, hex_select and tree_edit benchmarks need PySide6 and are skipped
+without it.
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+import Command
+
+
+# Commands that end or redirect a script; the generator only uses them as
+# the final command so the body stays a straight run.
+_TERMINATORS = frozenset((Command.MOVESET_END, Command.GOTO, Command.RETURN))
+
+
+def _opcode_bits(code: str) -> int:
+    """First-word bits that select the command, for a COMMANDS key."""
+    return int(code, 16) << 24
+
+
+def _random_command(rng, code, cls) -> bytes:
+    words = [0] * (cls.command_size // 8)
+    words[0] = _opcode_bits(code)
+    for f in cls.fields:
+        words[f.word] |= rng.getrandbits(f.width) << f.shift
+    return cls._struct.pack(*words)
+
+
+def GenerateMoveset(n_commands, mix=None, seed=0) -> bytes:
+    """Build a script of `n_commands` commands ending in MOVESET_END.
+
+    `mix` maps command class names to relative weights (default: every non-
+    terminating command in Command.COMMANDS, equally weighted). Field values
+    are random and bits outside the declared fields are left zero, so the
+    result re-encodes to itself."""
+    by_name = {cls.__name__: (code, cls) for code, cls in Command.COMMANDS.items()
+               if cls not in _TERMINATORS}
+    if mix is None:
+        mix = dict.fromkeys(by_name, 1)
+    unknown = set(mix) - set(by_name)
+    if unknown:
+        raise ValueError(f"Not usable in a generated script: {', '.join(sorted(unknown))}")
+    rng = random.Random(seed)
+    choices = rng.choices([by_name[name] for name in mix], weights=list(mix.values()),
+                          k=max(n_commands - 1, 0))
+    parts = [_random_command(rng, code, cls) for code, cls in choices]
+    parts.append(_random_command(rng, '00', Command.MOVESET_END))
+    return b"".join(parts)
+
+
+# ── Benchmarks ────────────────────────────────────────────────────────────────
+# Each takes the script bytes and returns a zero-argument callable to time;
+# setup work (parsing, building a window) happens outside the timed call.
+
+def _bench_decode(data):
+    return lambda: Command.ParseMoveset(data)
+
+
+def _bench_decode_lazy(data):
+    return lambda: Command.ParseMoveset(data, lazy=True)
+
+
+def _bench_encode(data):
+    commands = Command.ParseMoveset(data)
+    return lambda: Command.EncodeMoveset(commands)
+
+
+def _bench_encode_hex(data):
+    commands = Command.ParseMoveset(data)
+    return lambda: [comm.ToHex() for comm in commands]
+
+
+def _bench_roundtrip(data):
+    def run():
+        out = Command.EncodeMoveset(Command.ParseMoveset(data))
+        if out != data:
+            raise AssertionError("round trip changed the script")
+    return run
+
+
+_app = None       # kept referenced so the QApplication outlives the viewer
+_viewer = None
+
+
+def _get_viewer():
+    global _app, _viewer
+    if _viewer is None:
+        from PySide6.QtWidgets import QApplication
+        import Main
+        _app = QApplication.instance() or QApplication([])
+        _viewer = Main.BinaryFileViewer()
+    return _viewer
+
+
+def _bench_tree(data):
+    import Main
+    _get_viewer()
+    commands = Command.ParseMoveset(data)
+
+    def run():
+        # What a view does to show every top-level row: build the model and
+        # ask each row for its label.
+        model = Main.CommandTreeModel(commands)
+        for row in range(model.rowCount()):
+            model.data(model.index(row, 0))
+        return model
+    return run
+
+
+def _bench_html(data):
+    viewer = _get_viewer()
+    viewer.tree_model.SetCommands(Command.ParseMoveset(data))
+    return lambda: viewer.binary_text.ShowCommands(viewer.commands)
+
+
+def _bench_hex_select(data):
+    # Clicking through the script: 100 selection changes spread over it,
+    # on a display that is already built.
+    viewer = _get_viewer()
+    viewer.tree_model.SetCommands(Command.ParseMoveset(data))
+    viewer.binary_text.ShowCommands(viewer.commands)
+    rows = range(0, len(viewer.commands), max(1, len(viewer.commands) // 100))
+
+    def run():
+        for row in rows:
+            viewer.binary_text.SetSelected(row)
+    return run
+
+
+def _bench_tree_edit(data):
+    # Undoable inserts, moves and removes spread over a fully expanded
+    # script. Each edit shifts the rows of the commands after it, and the
+    # view then asks for the parent of every field row it walks.
+    import Main
+    viewer = _get_viewer()
+    viewer.show()  # a hidden view never lays its rows out
+    viewer.undo_stack.clear()
+    viewer.tree_model.SetCommands(Command.ParseMoveset(data))
+    viewer.binary_text.ShowCommands(viewer.commands)
+    viewer.tree.expandAll()
+    viewer.tree.doItemsLayout()
+    n = len(viewer.commands)
+    wait = Command.WAIT(bytes.fromhex("04000001"))
+
+    def run():
+        for i in range(5):
+            viewer.undo_stack.push(Main.InsertCommandDelta(viewer, n // 100 + i * n // 10, wait))
+        for i in range(5):
+            viewer.undo_stack.push(Main.MoveCommandDelta(viewer, n // 200 + i, n // 2 + i))
+        for i in range(5):
+            viewer.undo_stack.push(Main.RemoveCommandDelta(viewer, n // 50 + i * n // 100))
+        while viewer.undo_stack.canUndo():
+            viewer.undo_stack.undo()
+    return run
+
+
+BENCHMARKS = {
+    "decode": _bench_decode,
+    "decode_lazy": _bench_decode_lazy,
+    "encode": _bench_encode,
+    "encode_hex": _bench_encode_hex,
+    "roundtrip": _bench_roundtrip,
+    "tree": _bench_tree,
+    "html": _bench_html,
+    "hex_select": _bench_hex_select,
+    "tree_edit": _bench_tree_edit,
+}
+_NEEDS_QT = frozenset(("tree", "html", "hex_select", "tree_edit"))
+
+
+def _have_qt() -> bool:
+    try:
+        import PySide6.QtWidgets  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def RunBenchmark(name, data, n_commands, repeat=3) -> dict:
+    fn = BENCHMARKS[name](data)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "name": name,
+        "commands": n_commands,
+        "bytes": len(data),
+        "seconds": best,
+        "commands_per_sec": n_commands / best if best else None,
+        "mb_per_sec": len(data) / best / 1e6 if best else None,
+        "peak_bytes": peak,
+    }
+
+
+def RunSuite(sizes=(1000, 10000, 100000), names=None, repeat=3, seed=0, mix=None) -> dict:
+    names = list(names or BENCHMARKS)
+    skipped = []
+    if not _have_qt():
+        skipped = [name for name in names if name in _NEEDS_QT]
+        names = [name for name in names if name not in _NEEDS_QT]
+    results = []
+    for n in sizes:
+        data = GenerateMoveset(n, mix, seed)
+        for name in names:
+            results.append(RunBenchmark(name, data, n, repeat))
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "repeat": repeat,
+        "skipped": skipped,
+        "results": results,
+    }
+
+
+def CompareResults(old, new, threshold=0.10) -> list:
+    """(name, commands, old_seconds, new_seconds) for every benchmark that got
+    more than `threshold` slower between two RunSuite outputs."""
+    before = {(r["name"], r["commands"]): r["seconds"] for r in old["results"]}
+    slower = []
+    for r in new["results"]:
+        prev = before.get((r["name"], r["commands"]))
+        if prev and r["seconds"] > prev * (1 + threshold):
+            slower.append((r["name"], r["commands"], prev, r["seconds"]))
+    return slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark moveset parsing, encoding and rendering.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="benchmarks to run")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mix", help='JSON object of class name to weight, e.g. {"HITBOX": 3, "WAIT": 1}')
+    parser.add_argument("-o", "--output", help="write JSON here instead of stdout")
+    parser.add_argument("--compare", help="earlier JSON output to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="slowdown ratio reported as a regression (default 0.10)")
+    args = parser.parse_args(argv)
+
+    mix = json.loads(args.mix) if args.mix else None
+    report = RunSuite(args.sizes, args.only, args.repeat, args.seed, mix)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            slower = CompareResults(json.load(f), report, args.threshold)
+        for name, n, old_s, new_s in slower:
+            print(f"{name} @ {n}: {old_s:.4f}s -> {new_s:.4f}s", file=sys.stderr)
+        return 1 if slower else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
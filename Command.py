@@ -1,17 +1,19 @@
-from abc import ABC
-from dataclasses import dataclass
+from abc import ABC, ABCMeta
+from typing import NamedTuple
+import bisect
+import struct
 import DataType
 
 
 # ── Helpers ───────────────────────────────────────────────────────────────────
 
-def get_hex(s, pos, amount=1):
-    return int(s[pos*2:pos*2+amount*2], 16)
+_WORD = struct.Struct('>I')
+_FLOAT = struct.Struct('>f')
 
 
-def get_word(s, word_idx=0):
-    """Read a 32-bit big-endian word from a hex string by word index."""
-    return int(s[word_idx*8:(word_idx+1)*8], 16)
+def get_word(data, word_idx=0):
+    """Read a 32-bit big-endian word from a byte buffer by word index."""
+    return _WORD.unpack_from(data, word_idx*4)[0]
 
 
 def sx(val, bits):
@@ -21,29 +23,168 @@ def sx(val, bits):
     return val
 
 
-def _opcode(hex_str):
-    """Return the 6-bit opcode from the first byte of a hex string."""
-    return int(hex_str[0:2], 16) >> 2
+def _upper_float(bits):
+    """Expand the upper 16 bits of a float32 (Remix 'upper float') to a float."""
+    return _FLOAT.unpack(_WORD.pack(bits << 16))[0]
+
+
+def _upper_float_bits(value, old=0):
+    """Truncate a float to the upper 16 bits of its float32 encoding. Python
+    does not keep NaN payloads, so a NaN replacing NaN bits `old` keeps them."""
+    bits = _WORD.unpack(_FLOAT.pack(float(value)))[0] >> 16
+    if bits & 0x7F80 == 0x7F80 and bits & 0x7F and old & 0x7F80 == 0x7F80 and old & 0x7F:
+        return old
+    return bits
+
+
+# ── Field codec ───────────────────────────────────────────────────────────────
+
+class Field(NamedTuple):
+    """One bitfield of a command: `width` bits starting at bit `shift` of the
+    32-bit big-endian word `word`. FLOAT32 fields hold the upper 16 bits of
+    a float32."""
+    name: str
+    dtype: type
+    word: int
+    shift: int
+    width: int
+    signed: bool = False
+
+
+def _compile_codec(cls):
+    """Generate cls.Decode / cls.Encode from cls.fields.
+
+    Decode unpacks all words once and builds every DataType value with plain
+    shifts and masks, storing it without going through SetValue, whose
+    clamping and 16-bit sign folding would change values of wider fields.
+    Encode returns the command's words, starting from the raw words so bits
+    no field covers (opcode, group id, padding) survive a round trip
+    untouched; an unedited command encodes to exactly the bytes it was
+    decoded from."""
+    n_words = cls.command_size // 8
+    owned = [0] * n_words
+    ns = {'_struct': cls._struct, '_upper_float': _upper_float,
+          '_upper_float_bits': _upper_float_bits, '_new': object.__new__}
+    dec = ['def Decode(self, data):',
+           f'    {", ".join(f"w{i}" for i in range(n_words))}, = _struct.unpack(data)']
+    terms = [[] for _ in range(n_words)]
+
+    for i, f in enumerate(cls.fields):
+        is_float = issubclass(f.dtype, DataType.FLOAT32)
+        mask = (1 << f.width) - 1
+        if not 0 <= f.word < n_words:
+            raise ValueError(f"{cls.__name__}.{f.name}: word {f.word} outside a {n_words}-word command")
+        if f.width <= 0 or f.shift < 0 or f.shift + f.width > 32:
+            raise ValueError(f"{cls.__name__}.{f.name}: bits {f.shift}+{f.width} do not fit in a word")
+        if owned[f.word] & (mask << f.shift):
+            raise ValueError(f"{cls.__name__}.{f.name}: overlaps another field in word {f.word}")
+        if is_float and (f.width != 16 or f.signed):
+            raise ValueError(f"{cls.__name__}.{f.name}: FLOAT32 fields must be plain 16-bit upper floats")
+        owned[f.word] |= mask << f.shift
+
+        ns[f'_t{i}'] = f.dtype
+        raw = f'(w{f.word} >> {f.shift})' if f.shift else f'w{f.word}'
+        if f.shift + f.width < 32:
+            raw = f'({raw} & {mask:#x})'
+        if is_float:
+            raw = f'_upper_float({raw})'
+        elif f.signed:
+            sign = 1 << (f.width - 1)
+            raw = f'(({raw} ^ {sign:#x}) - {sign:#x})'
+        dec.append(f'    self.{f.name} = v = _new(_t{i})')
+        dec.append(f'    v.value = {raw}')
+
+        val = f'self.{f.name}.value'
+        if is_float:
+            old = f'(w[{f.word}] >> {f.shift}) & {mask:#x}' if f.shift else f'w[{f.word}] & {mask:#x}'
+            val = f'_upper_float_bits({val}, {old})'
+        else:
+            val = f'int({val})'
+        term = f'({val} & {mask:#x})'
+        if f.shift:
+            term = f'({term} << {f.shift})'
+        terms[f.word].append(term)
+
+    enc = ['def Encode(self):',
+           '    w = _struct.unpack(self._data)',
+           '    return (']
+    for i in range(n_words):
+        keep = ~owned[i] & 0xFFFFFFFF
+        enc.append(f'        (w[{i}] & {keep:#x})' + ''.join(f'\n        | {t}' for t in terms[i]) + ',')
+    enc.append('    )')
+
+    src = '\n'.join(dec) + '\n\n' + '\n'.join(enc) + '\n'
+    exec(compile(src, f'<codec {cls.__name__}>', 'exec'), ns)
+    cls.Decode = ns['Decode']
+    cls.Encode = ns['Encode']
 
 
-def _w1(opcode, payload=0):
-    """Build the first word of a 1-word command."""
-    return f'{(opcode << 26) | (payload & 0x3FFFFFF):08X}'
+# ── Base ──────────────────────────────────────────────────────────────────────
 
+class _CommandMeta(ABCMeta):
+    """Gives every command class __slots__ for its declared fields, so command
+    instances carry no per-instance __dict__."""
+    def __new__(mcls, name, bases, ns, **kwargs):
+        if '__slots__' not in ns:
+            ns['__slots__'] = tuple(f.name for f in ns.get('fields', ()))
+        return super().__new__(mcls, name, bases, ns, **kwargs)
 
-# ── Base ──────────────────────────────────────────────────────────────────────
 
-@dataclass
-class BaseCommand(ABC):
-    _hex: str
+class BaseCommand(ABC, metaclass=_CommandMeta):
+    __slots__ = ('_data',)
     command_name: str
-    command_size: int = 8
+    command_size: int = 8  # in hex characters (two per byte)
+
+    # Bitfield layout, compiled into Decode/Encode when the class is created.
+    fields = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._struct = struct.Struct(f'>{cls.command_size // 8}I')
+        if 'fields' in cls.__dict__:
+            _compile_codec(cls)
+
+    def __init__(self, data):
+        # Hex strings are still accepted as a thin adapter for the GUI.
+        if isinstance(data, str):
+            data = bytes.fromhex(data)
+        self._data = bytes(data)
+        self.Decode(self._data)
+
+    def Decode(self, data: bytes):
+        """Populate the command's fields from its raw bytes."""
+        pass
+
+    def Encode(self) -> tuple:
+        """Return the command's current value as a tuple of 32-bit words."""
+        return self._struct.unpack(self._data)
+
+    def GetFields(self) -> list:
+        """(name, DataType value) for every field, in declaration order."""
+        return [(f.name, getattr(self, f.name)) for f in self.fields]
+
+    @property
+    def _hex(self) -> str:
+        return self._data.hex().upper()
+
+    def __repr__(self):
+        values = ', '.join(f'{name}={v.value!r}' for name, v in self.GetFields())
+        return f'{type(self).__name__}({values})'
+
+    def ToBytes(self) -> bytes:
+        return self._struct.pack(*self.Encode())
 
-    def __init__(self, _hex: str):
-        self._hex = _hex
+    def WriteInto(self, buf, offset=0) -> int:
+        """Encode the command straight into a writable buffer at `offset` and
+        return the offset just past it."""
+        self._struct.pack_into(buf, offset, *self.Encode())
+        return offset + self._struct.size
 
     def ToHex(self):
-        return self._hex
+        return self.ToBytes().hex().upper()
+
+
+BaseCommand._struct = _WORD
 
 
 # ── End / timing ──────────────────────────────────────────────────────────────
@@ -55,103 +196,42 @@ class MOVESET_END(BaseCommand):
 
 class WAIT(BaseCommand):
     command_name = "Wait"
-    time: DataType.UNSIGNED_INT
-
-    def __init__(self, _hex):
-        super().__init__(_hex)
-        self.time = DataType.UNSIGNED_INT(get_hex(_hex, 2, 2))
-
-    def ToHex(self):
-        return self._hex[0:2] + f'{self.time.value:06X}'
+    fields = (Field('time', DataType.UNSIGNED_INT, 0, 0, 24),)
 
 
 class AFTER(BaseCommand):
     command_name = "After"
-    time: DataType.UNSIGNED_INT
-
-    def __init__(self, _hex):
-        super().__init__(_hex)
-        self.time = DataType.UNSIGNED_INT(get_hex(_hex, 2, 2))
-
-    def ToHex(self):
-        return self._hex[0:2] + f'{self.time.value:06X}'
+    fields = (Field('time', DataType.UNSIGNED_INT, 0, 0, 24),)
 
 
 # ── Hitbox creation ───────────────────────────────────────────────────────────
 
 class HITBOX(BaseCommand):
-    """MakeAttackColl / MakeAttackCollScaled (opcodes 3 & 4 — 5 words)."""
+    """MakeAttackColl / MakeAttackCollScaled (opcodes 3 & 4 — 5 words).
+    group_id (word 0, bits 22:20) is not user-editable and is carried over
+    from the raw bytes."""
     command_name = "Hitbox"
     command_size = 40
-
-    hitbox_id: DataType.UNSIGNED_INT
-    damage: DataType.UNSIGNED_INT
-    base_knockback: DataType.UNSIGNED_INT
-    fixed_knockback: DataType.UNSIGNED_INT
-    knockback_scaling: DataType.UNSIGNED_INT
-    angle: DataType.SIGNED_INT3
-    bone: DataType.UNSIGNED_INT
-    x: DataType.SIGNED_INT
-    y: DataType.SIGNED_INT
-    z: DataType.SIGNED_INT
-    hit_aerial_targets: DataType.UNSIGNED_INT
-    hit_grounded_targets: DataType.UNSIGNED_INT
-    shield_damage: DataType.UNSIGNED_INT
-    clang: DataType.UNSIGNED_INT
-    size: DataType.UNSIGNED_INT
-    effect: DataType.EFFECT_TYPE
-    sound_type: DataType.SOUND_TYPE
-    sound_level: DataType.SOUND_LEVEL
-
-    def __init__(self, _hex: str):
-        super().__init__(_hex)
-
-        combined = ((get_hex(_hex, 1) >> 4) + (get_hex(_hex, 0) << 4) - 0xC0)
-        self.hitbox_id = DataType.UNSIGNED_INT(combined / 8)  # attack_id bits[25:23]
-        self._group_id  = combined % 8                        # group_id bits[22:20], not user-editable
-        self.damage = DataType.UNSIGNED_INT(((get_hex(_hex, 3) >> 4) +
-                                             ((get_hex(_hex, 2) << 4) & 0xFF)) / 2)
-        self.base_knockback = DataType.UNSIGNED_INT(((get_hex(_hex, 19) >> 4) +
-                                                     (get_hex(_hex, 18) << 4)) / 8)
-        self.fixed_knockback = DataType.UNSIGNED_INT(
-            (get_hex(_hex, 15) + ((get_hex(_hex, 14) << 8) & 0xFFF)) / 4)
-        self.knockback_scaling = DataType.UNSIGNED_INT(((get_hex(_hex, 14) >> 4) & 0xF) +
-                                                       ((get_hex(_hex, 13) << 4) & 0xFF))
-        self.angle = DataType.SIGNED_INT3(
-            ((get_hex(_hex, 12) << 4) + (get_hex(_hex, 13) >> 4)) / 4)
-        self.bone = DataType.UNSIGNED_INT((((get_hex(_hex, 1) << 4) & 0xFF) +
-                                           (get_hex(_hex, 2) >> 4)) / 2)
-        self.x = DataType.SIGNED_INT(get_hex(_hex, 7) + (get_hex(_hex, 6) << 8))
-        self.y = DataType.SIGNED_INT(get_hex(_hex, 9) + (get_hex(_hex, 8) << 8))
-        self.z = DataType.SIGNED_INT(get_hex(_hex, 11) + (get_hex(_hex, 10) << 8))
-        self.hit_aerial_targets = DataType.UNSIGNED_INT(get_hex(_hex, 15) & 1)
-        self.hit_grounded_targets = DataType.UNSIGNED_INT((get_hex(_hex, 15) >> 1) & 1)
-        self.shield_damage = DataType.UNSIGNED_INT(get_hex(_hex, 16))
-        self.clang = DataType.UNSIGNED_INT((get_hex(_hex, 3) >> 4) & 1)
-        self.size = DataType.UNSIGNED_INT((get_hex(_hex, 5) + (get_hex(_hex, 4) << 8)) / 2)
-        self.effect = DataType.EFFECT_TYPE(get_hex(_hex, 3) & 0xF)
-        self.sound_type = DataType.SOUND_TYPE((get_hex(_hex, 17) & 0xF) / 2)
-        self.sound_level = DataType.SOUND_LEVEL((get_hex(_hex, 17) >> 4) / 2)
-
-    def ToHex(self):
-        opc = _opcode(self._hex)
-        w1 = (opc << 26) | (self.hitbox_id.value << 23) | (self._group_id << 20)
-        w1 |= (self.bone.value << 13)
-        w1 |= (self.damage.value << 5)
-        w1 |= (self.clang.value << 4)
-        w1 |= (7 if self.effect.value == 5 else self.effect.value)
-        w2 = (self.size.value << 17) | (self.x.GetValue() & 0xFFFF)
-        w3 = ((self.y.GetValue() << 16) & 0xFFFF0000) | (self.z.GetValue() & 0xFFFF)
-        w4 = ((self.angle.GetValue() << 22) & 0xFFF00000)
-        w4 += self.knockback_scaling.value << 12
-        w4 += self.fixed_knockback.value * 4
-        w4 += self.hit_grounded_targets.value * 2
-        w4 += self.hit_aerial_targets.value
-        w5 = self.shield_damage.value << 24
-        w5 += (self.sound_level.value * 2) << 20
-        w5 += (self.sound_type.value * 2) << 16
-        w5 += (self.base_knockback.value * 8) << 4
-        return f'{w1:08X}{w2:08X}{w3:08X}{w4:08X}{w5:08X}'
+    fields = (
+        Field('hitbox_id',            DataType.UNSIGNED_INT, 0, 23, 3),
+        Field('damage',               DataType.UNSIGNED_INT, 0, 5, 8),
+        Field('base_knockback',       DataType.UNSIGNED_INT, 4, 7, 10),
+        Field('fixed_knockback',      DataType.UNSIGNED_INT, 3, 2, 10),
+        Field('knockback_scaling',    DataType.UNSIGNED_INT, 3, 12, 10),
+        Field('angle',                DataType.SIGNED_INT3,  3, 22, 10, signed=True),
+        Field('bone',                 DataType.UNSIGNED_INT, 0, 13, 7),
+        Field('x',                    DataType.SIGNED_INT,   1, 0, 16, signed=True),
+        Field('y',                    DataType.SIGNED_INT,   2, 16, 16, signed=True),
+        Field('z',                    DataType.SIGNED_INT,   2, 0, 16, signed=True),
+        Field('hit_aerial_targets',   DataType.UNSIGNED_INT, 3, 0, 1),
+        Field('hit_grounded_targets', DataType.UNSIGNED_INT, 3, 1, 1),
+        Field('shield_damage',        DataType.UNSIGNED_INT, 4, 24, 8),
+        Field('clang',                DataType.UNSIGNED_INT, 0, 4, 1),
+        Field('size',                 DataType.UNSIGNED_INT, 1, 17, 15),
+        Field('effect',               DataType.EFFECT_TYPE,  0, 0, 4),
+        Field('sound_type',           DataType.SOUND_TYPE,   4, 17, 4),
+        Field('sound_level',          DataType.SOUND_LEVEL,  4, 21, 3),
+    )
 
 
 # ── Hitbox modification ───────────────────────────────────────────────────────
@@ -159,14 +239,7 @@ class HITBOX(BaseCommand):
 class CLEAR_HITBOX(BaseCommand):
     command_name = "Delete Hitbox"
     command_size = 8
-    hitbox_id: DataType.UNSIGNED_INT
-
-    def __init__(self, _hex):
-        super().__init__(_hex)
-        self.hitbox_id = DataType.UNSIGNED_INT((get_word(_hex) >> 23) & 0x7)
-
-    def ToHex(self):
-        return _w1(5, self.hitbox_id.value << 23)
+    fields = (Field('hitbox_id', DataType.UNSIGNED_INT, 0, 23, 3),)
 
 
 class END_HITBOX(BaseCommand):
@@ -178,85 +251,45 @@ class SET_HITBOX_OFFSET(BaseCommand):
     """SetAttackCollOffset — 2 words."""
     command_name = "Set Hitbox Offset"
     command_size = 16
-    attack_id: DataType.UNSIGNED_INT
-    x: DataType.SIGNED_INT
-    y: DataType.SIGNED_INT
-    z: DataType.SIGNED_INT
-
-    def __init__(self, _hex):
-        super().__init__(_hex)
-        w1 = get_word(_hex, 0)
-        w2 = get_word(_hex, 1)
-        self.attack_id = DataType.UNSIGNED_INT((w1 >> 23) & 0x7)
-        self.x = DataType.SIGNED_INT(sx((w1 >> 7) & 0xFFFF, 16))
-        self.y = DataType.SIGNED_INT(sx((w2 >> 16) & 0xFFFF, 16))
-        self.z = DataType.SIGNED_INT(sx(w2 & 0xFFFF, 16))
-
-    def ToHex(self):
-        w1 = (7 << 26) | (self.attack_id.value << 23) | ((self.x.GetValue() & 0xFFFF) << 7)
-        w2 = ((self.y.GetValue() & 0xFFFF) << 16) | (self.z.GetValue() & 0xFFFF)
-        return f'{w1:08X}{w2:08X}'
+    fields = (
+        Field('attack_id', DataType.UNSIGNED_INT, 0, 23, 3),
+        Field('x',         DataType.SIGNED_INT,   0, 7, 16, signed=True),
+        Field('y',         DataType.SIGNED_INT,   1, 16, 16, signed=True),
+        Field('z',         DataType.SIGNED_INT,   1, 0, 16, signed=True),
+    )
 
 
 class SET_HITBOX_DAMAGE(BaseCommand):
     command_name = "Set Hitbox Damage"
     command_size = 8
-    attack_id: DataType.UNSIGNED_INT
-    damage: DataType.UNSIGNED_INT
-
-    def __init__(self, _hex):
-        super().__init__(_hex)
-        w = get_word(_hex)
-        self.attack_id = DataType.UNSIGNED_INT((w >> 23) & 0x7)
-        self.damage = DataType.UNSIGNED_INT((w >> 15) & 0xFF)
-
-    def ToHex(self):
-        return _w1(8, (self.attack_id.value << 23) | (self.damage.value << 15))
+    fields = (
+        Field('attack_id', DataType.UNSIGNED_INT, 0, 23, 3),
+        Field('damage',    DataType.UNSIGNED_INT, 0, 15, 8),
+    )
 
 
 class SET_HITBOX_SIZE(BaseCommand):
     command_name = "Set Hitbox Size"
     command_size = 8
-    attack_id: DataType.UNSIGNED_INT
-    size: DataType.UNSIGNED_INT
-
-    def __init__(self, _hex):
-        super().__init__(_hex)
-        w = get_word(_hex)
-        self.attack_id = DataType.UNSIGNED_INT((w >> 23) & 0x7)
-        self.size = DataType.UNSIGNED_INT((w >> 7) & 0xFFFF)
-
-    def ToHex(self):
-        return _w1(9, (self.attack_id.value << 23) | (self.size.value << 7))
+    fields = (
+        Field('attack_id', DataType.UNSIGNED_INT, 0, 23, 3),
+        Field('size',      DataType.UNSIGNED_INT, 0, 7, 16),
+    )
 
 
 class SET_HITBOX_SOUND_LEVEL(BaseCommand):
     command_name = "Set Hitbox Sound Level"
     command_size = 8
-    attack_id: DataType.UNSIGNED_INT
-    level: DataType.SOUND_LEVEL
-
-    def __init__(self, _hex):
-        super().__init__(_hex)
-        w = get_word(_hex)
-        self.attack_id = DataType.UNSIGNED_INT((w >> 23) & 0x7)
-        self.level = DataType.SOUND_LEVEL((w >> 20) & 0x7)
-
-    def ToHex(self):
-        return _w1(10, (self.attack_id.value << 23) | (self.level.value << 20))
+    fields = (
+        Field('attack_id', DataType.UNSIGNED_INT, 0, 23, 3),
+        Field('level',     DataType.SOUND_LEVEL,  0, 20, 3),
+    )
 
 
 class REVIVE_HITBOX(BaseCommand):
     command_name = "Revive Hitbox"
     command_size = 8
-    attack_id: DataType.UNSIGNED_INT
-
-    def __init__(self, _hex):
-        super().__init__(_hex)
-        self.attack_id = DataType.UNSIGNED_INT((get_word(_hex) >> 23) & 0x7)
-
-    def ToHex(self):
-        return _w1(11, self.attack_id.value << 23)
+    fields = (Field('attack_id', DataType.UNSIGNED_INT, 0, 23, 3),)
 
 
 # ── Throw ─────────────────────────────────────────────────────────────────────
@@ -265,28 +298,14 @@ class THROW_DATA(BaseCommand):
     """SetThrow — 2 words, word 2 is a file-relative pointer to FTThrowHitDesc."""
     command_name = "Throw Data"
     command_size = 16
-    pointer: DataType.UNSIGNED_INT
-
-    def __init__(self, _hex):
-        super().__init__(_hex)
-        self.pointer = DataType.UNSIGNED_INT(get_word(_hex, 1))
-
-    def ToHex(self):
-        return _w1(12) + f'{self.pointer.value:08X}'
+    fields = (Field('pointer', DataType.UNSIGNED_INT, 1, 0, 32),)
 
 
 class THROW_SUBROUTINE(BaseCommand):
     """SetDamageThrown — 2 words."""
     command_name = "Throw Subroutine"
     command_size = 16
-    pointer: DataType.UNSIGNED_INT
-
-    def __init__(self, _hex):
-        super().__init__(_hex)
-        self.pointer = DataType.UNSIGNED_INT(get_word(_hex, 1))
-
-    def ToHex(self):
-        return _w1(13) + f'{self.pointer.value:08X}'
+    fields = (Field('pointer', DataType.UNSIGNED_INT, 1, 0, 32),)
 
 
 # ── Audio ─────────────────────────────────────────────────────────────────────
@@ -294,102 +313,50 @@ class THROW_SUBROUTINE(BaseCommand):
 class PLAY_SFX(BaseCommand):
     command_name = "Play SFX"
     command_size = 8
-    sfx: DataType.SFX
-
-    def __init__(self, _hex):
-        super().__init__(_hex)
-        self.sfx = DataType.SFX(get_hex(_hex, 2, 2))
-
-    def ToHex(self):
-        return self._hex[0:2] + f'{self.sfx.value:06X}'
+    fields = (Field('sfx', DataType.SFX, 0, 0, 24),)
 
 
 class PLAY_LOOP_SFX(BaseCommand):
     command_name = "Play Loop SFX"
     command_size = 8
-    sfx: DataType.SFX
-
-    def __init__(self, _hex):
-        super().__init__(_hex)
-        self.sfx = DataType.SFX(get_word(_hex) & 0x3FFFFFF)
-
-    def ToHex(self):
-        return _w1(15, self.sfx.value)
+    fields = (Field('sfx', DataType.SFX, 0, 0, 26),)
 
 
 class STOP_LOOP_SFX(BaseCommand):
     command_name = "Stop Loop SFX"
     command_size = 8
 
-    def ToHex(self):
-        return _w1(16)
-
 
 class VOICE_SFX(BaseCommand):
     command_name = "Voice SFX"
     command_size = 8
-    sfx: DataType.SFX
-
-    def __init__(self, _hex):
-        super().__init__(_hex)
-        self.sfx = DataType.SFX(get_hex(_hex, 2, 2))
-
-    def ToHex(self):
-        return self._hex[0:2] + f'{self.sfx.value:06X}'
+    fields = (Field('sfx', DataType.SFX, 0, 0, 24),)
 
 
 class PLAY_LOOP_VOICE(BaseCommand):
     command_name = "Play Loop Voice"
     command_size = 8
-    sfx: DataType.SFX
-
-    def __init__(self, _hex):
-        super().__init__(_hex)
-        self.sfx = DataType.SFX(get_word(_hex) & 0x3FFFFFF)
-
-    def ToHex(self):
-        return _w1(18, self.sfx.value)
+    fields = (Field('sfx', DataType.SFX, 0, 0, 26),)
 
 
 class PLAY_FGM_STORE(BaseCommand):
     """PlayFGMStoreInfo — same payload shape as PLAY_SFX but opcode 19."""
     command_name = "Play FGM (Store)"
     command_size = 8
-    sfx: DataType.SFX
-
-    def __init__(self, _hex):
-        super().__init__(_hex)
-        self.sfx = DataType.SFX(get_hex(_hex, 2, 2))
-
-    def ToHex(self):
-        return self._hex[0:2] + f'{self.sfx.value:06X}'
+    fields = (Field('sfx', DataType.SFX, 0, 0, 24),)
 
 
 class SMASH_VOICE(BaseCommand):
     command_name = "Smash Voice"
     command_size = 8
-    sfx: DataType.SFX
-
-    def __init__(self, _hex):
-        super().__init__(_hex)
-        self.sfx = DataType.SFX(get_word(_hex) & 0x3FFFFFF)
-
-    def ToHex(self):
-        return _w1(20, self.sfx.value)
+    fields = (Field('sfx', DataType.SFX, 0, 0, 26),)
 
 
 # ── Game flags ────────────────────────────────────────────────────────────────
 
 class _SET_FLAG(BaseCommand):
     command_size = 8
-    value: DataType.UNSIGNED_INT
-
-    def __init__(self, _hex):
-        super().__init__(_hex)
-        self.value = DataType.UNSIGNED_INT(get_word(_hex) & 0x3FFFFFF)
-
-    def ToHex(self):
-        return _w1(_opcode(self._hex), self.value.value)
+    fields = (Field('value', DataType.UNSIGNED_INT, 0, 0, 26),)
 
 
 class SET_FLAG0(_SET_FLAG):
@@ -411,27 +378,13 @@ class SET_FLAG3(_SET_FLAG):
 class SET_AIR_JUMP_ADD(BaseCommand):
     command_name = "Set Air Jump Add"
     command_size = 8
-    value: DataType.UNSIGNED_INT
-
-    def __init__(self, _hex):
-        super().__init__(_hex)
-        self.value = DataType.UNSIGNED_INT(get_word(_hex) & 0x3FFFFFF)
-
-    def ToHex(self):
-        return _w1(25, self.value.value)
+    fields = (Field('value', DataType.UNSIGNED_INT, 0, 0, 26),)
 
 
 class SET_AIR_JUMP_MAX(BaseCommand):
     command_name = "Set Air Jump Max"
     command_size = 8
-    value: DataType.UNSIGNED_INT
-
-    def __init__(self, _hex):
-        super().__init__(_hex)
-        self.value = DataType.UNSIGNED_INT(get_word(_hex) & 0x3FFFFFF)
-
-    def ToHex(self):
-        return _w1(26, self.value.value)
+    fields = (Field('value', DataType.UNSIGNED_INT, 0, 0, 26),)
 
 
 # ── Hurtboxes ─────────────────────────────────────────────────────────────────
@@ -439,84 +392,42 @@ class SET_AIR_JUMP_MAX(BaseCommand):
 class SET_ALL_HURTBOX_STATE(BaseCommand):
     command_name = "Set All Hurtbox State"
     command_size = 8
-    state: DataType.HURTBOX_STATE
-
-    def __init__(self, _hex):
-        super().__init__(_hex)
-        self.state = DataType.HURTBOX_STATE(get_word(_hex) & 0x3FFFFFF)
-
-    def ToHex(self):
-        return _w1(27, self.state.value)
+    fields = (Field('state', DataType.HURTBOX_STATE, 0, 0, 26),)
 
 
 class SET_SPECIFIC_HURTBOX_STATE(BaseCommand):
     command_name = "Set Specific Hurtbox State"
     command_size = 8
-    part: DataType.UNSIGNED_INT
-    state: DataType.HURTBOX_STATE
-
-    def __init__(self, _hex):
-        super().__init__(_hex)
-        self.part = DataType.UNSIGNED_INT(get_hex(_hex, 1) / 8)
-        self.state = DataType.HURTBOX_STATE(get_hex(_hex, 3))
-
-    def ToHex(self):
-        return self._hex[0:2] + f'{self.part.value*8:02X}' + '00' + f'{self.state.value:02X}'
+    fields = (
+        Field('part',  DataType.UNSIGNED_INT,  0, 19, 5),
+        Field('state', DataType.HURTBOX_STATE, 0, 0, 8),
+    )
 
 
 class SET_HURTBOX_STATE(BaseCommand):
     command_name = "Set Hurtbox State"
     command_size = 8
-    state: DataType.HURTBOX_STATE
-
-    def __init__(self, _hex):
-        super().__init__(_hex)
-        self.state = DataType.HURTBOX_STATE(get_word(_hex) & 0x3FFFFFF)
-
-    def ToHex(self):
-        return _w1(29, self.state.value)
+    fields = (Field('state', DataType.HURTBOX_STATE, 0, 0, 26),)
 
 
 class RESET_DAMAGE_COLL(BaseCommand):
     command_name = "Reset Damage Collision"
     command_size = 8
 
-    def ToHex(self):
-        return _w1(30)
-
 
 class SET_HURTBOX_SIZE(BaseCommand):
     """SetDamageCollPartID — 4 words, sets per-part hurtbox offset + size."""
     command_name = "Set Hurtbox Size"
     command_size = 32
-    joint_id: DataType.SIGNED_INT
-    ox: DataType.SIGNED_INT
-    oy: DataType.SIGNED_INT
-    oz: DataType.SIGNED_INT
-    sx_: DataType.SIGNED_INT
-    sy: DataType.SIGNED_INT
-    sz: DataType.SIGNED_INT
-
-    def __init__(self, _hex):
-        super().__init__(_hex)
-        w1 = get_word(_hex, 0)
-        w2 = get_word(_hex, 1)
-        w3 = get_word(_hex, 2)
-        w4 = get_word(_hex, 3)
-        self.joint_id = DataType.SIGNED_INT(sx((w1 >> 19) & 0x7F, 7))
-        self.ox = DataType.SIGNED_INT(sx((w2 >> 16) & 0xFFFF, 16))
-        self.oy = DataType.SIGNED_INT(sx(w2 & 0xFFFF, 16))
-        self.oz = DataType.SIGNED_INT(sx((w3 >> 16) & 0xFFFF, 16))
-        self.sx_ = DataType.SIGNED_INT(sx(w3 & 0xFFFF, 16))
-        self.sy = DataType.SIGNED_INT(sx((w4 >> 16) & 0xFFFF, 16))
-        self.sz = DataType.SIGNED_INT(sx(w4 & 0xFFFF, 16))
-
-    def ToHex(self):
-        w1 = (31 << 26) | ((self.joint_id.GetValue() & 0x7F) << 19)
-        w2 = ((self.ox.GetValue() & 0xFFFF) << 16) | (self.oy.GetValue() & 0xFFFF)
-        w3 = ((self.oz.GetValue() & 0xFFFF) << 16) | (self.sx_.GetValue() & 0xFFFF)
-        w4 = ((self.sy.GetValue() & 0xFFFF) << 16) | (self.sz.GetValue() & 0xFFFF)
-        return f'{w1:08X}{w2:08X}{w3:08X}{w4:08X}'
+    fields = (
+        Field('joint_id', DataType.SIGNED_INT, 0, 19, 7, signed=True),
+        Field('ox',       DataType.SIGNED_INT, 1, 16, 16, signed=True),
+        Field('oy',       DataType.SIGNED_INT, 1, 0, 16, signed=True),
+        Field('oz',       DataType.SIGNED_INT, 2, 16, 16, signed=True),
+        Field('sx_',      DataType.SIGNED_INT, 2, 0, 16, signed=True),
+        Field('sy',       DataType.SIGNED_INT, 3, 16, 16, signed=True),
+        Field('sz',       DataType.SIGNED_INT, 3, 0, 16, signed=True),
+    )
 
 
 # ── Control flow ──────────────────────────────────────────────────────────────
@@ -524,14 +435,7 @@ class SET_HURTBOX_SIZE(BaseCommand):
 class LOOP_START(BaseCommand):
     command_name = "Loop Start"
     command_size = 8
-    iterations: DataType.UNSIGNED_INT
-
-    def __init__(self, _hex):
-        super().__init__(_hex)
-        self.iterations = DataType.UNSIGNED_INT(get_hex(_hex, 2, 2))
-
-    def ToHex(self):
-        return self._hex[0:2] + f'{self.iterations.value:06X}'
+    fields = (Field('iterations', DataType.UNSIGNED_INT, 0, 0, 24),)
 
 
 class LOOP_END(BaseCommand):
@@ -543,49 +447,25 @@ class SUBROUTINE(BaseCommand):
     """Call a subroutine at a file-relative word offset."""
     command_name = "Subroutine"
     command_size = 16
-    address: DataType.UNSIGNED_INT
-
-    def __init__(self, _hex):
-        super().__init__(_hex)
-        self.address = DataType.UNSIGNED_INT(get_word(_hex, 1))
-
-    def ToHex(self):
-        return _w1(34) + f'{self.address.value:08X}'
+    fields = (Field('address', DataType.UNSIGNED_INT, 1, 0, 32),)
 
 
 class RETURN(BaseCommand):
     command_name = "Return"
     command_size = 8
 
-    def ToHex(self):
-        return _w1(35)
-
 
 class GOTO(BaseCommand):
     """Jump to a file-relative word offset."""
     command_name = "Goto"
     command_size = 16
-    address: DataType.UNSIGNED_INT
-
-    def __init__(self, _hex):
-        super().__init__(_hex)
-        self.address = DataType.UNSIGNED_INT(get_word(_hex, 1))
-
-    def ToHex(self):
-        return _w1(36) + f'{self.address.value:08X}'
+    fields = (Field('address', DataType.UNSIGNED_INT, 1, 0, 32),)
 
 
 class PAUSE_SCRIPT(BaseCommand):
     command_name = "Pause Script"
     command_size = 8
-    value: DataType.UNSIGNED_INT
-
-    def __init__(self, _hex):
-        super().__init__(_hex)
-        self.value = DataType.UNSIGNED_INT(get_word(_hex) & 0x3FFFFFF)
-
-    def ToHex(self):
-        return _w1(37, self.value.value)
+    fields = (Field('value', DataType.UNSIGNED_INT, 0, 0, 26),)
 
 
 # ── GFX / Effects ─────────────────────────────────────────────────────────────
@@ -595,39 +475,17 @@ class GFX(BaseCommand):
     flags=lower 10 bits, then position (x1,y1,z1) and spread (x2,y2,z2) as 16-bit signed."""
     command_name = "GFX"
     command_size = 32
-    bone: DataType.SIGNED_INT
-    effect: DataType.GFX
-    flags: DataType.UNSIGNED_INT
-    x1: DataType.SIGNED_INT
-    y1: DataType.SIGNED_INT
-    z1: DataType.SIGNED_INT
-    x2: DataType.SIGNED_INT
-    y2: DataType.SIGNED_INT
-    z2: DataType.SIGNED_INT
-
-    def __init__(self, _hex: str):
-        super().__init__(_hex)
-        w1 = get_word(_hex, 0)
-        w2 = get_word(_hex, 1)
-        w3 = get_word(_hex, 2)
-        w4 = get_word(_hex, 3)
-        self.bone   = DataType.SIGNED_INT(sx((w1 >> 19) & 0x7F, 7))
-        self.effect = DataType.GFX((w1 >> 10) & 0x1FF)
-        self.flags  = DataType.UNSIGNED_INT(w1 & 0x3FF)
-        self.x1 = DataType.SIGNED_INT(sx((w2 >> 16) & 0xFFFF, 16))
-        self.y1 = DataType.SIGNED_INT(sx(w2 & 0xFFFF, 16))
-        self.z1 = DataType.SIGNED_INT(sx((w3 >> 16) & 0xFFFF, 16))
-        self.x2 = DataType.SIGNED_INT(sx(w3 & 0xFFFF, 16))
-        self.y2 = DataType.SIGNED_INT(sx((w4 >> 16) & 0xFFFF, 16))
-        self.z2 = DataType.SIGNED_INT(sx(w4 & 0xFFFF, 16))
-
-    def ToHex(self):
-        opc = _opcode(self._hex)
-        w1 = (opc << 26) | ((self.bone.GetValue() & 0x7F) << 19) | (self.effect.value << 10) | (self.flags.value & 0x3FF)
-        w2 = ((self.x1.GetValue() & 0xFFFF) << 16) | (self.y1.GetValue() & 0xFFFF)
-        w3 = ((self.z1.GetValue() & 0xFFFF) << 16) | (self.x2.GetValue() & 0xFFFF)
-        w4 = ((self.y2.GetValue() & 0xFFFF) << 16) | (self.z2.GetValue() & 0xFFFF)
-        return f'{w1:08X}{w2:08X}{w3:08X}{w4:08X}'
+    fields = (
+        Field('bone',   DataType.SIGNED_INT,   0, 19, 7, signed=True),
+        Field('effect', DataType.GFX,          0, 10, 9),
+        Field('flags',  DataType.UNSIGNED_INT, 0, 0, 10),
+        Field('x1',     DataType.SIGNED_INT,   1, 16, 16, signed=True),
+        Field('y1',     DataType.SIGNED_INT,   1, 0, 16, signed=True),
+        Field('z1',     DataType.SIGNED_INT,   2, 16, 16, signed=True),
+        Field('x2',     DataType.SIGNED_INT,   2, 0, 16, signed=True),
+        Field('y2',     DataType.SIGNED_INT,   3, 16, 16, signed=True),
+        Field('z2',     DataType.SIGNED_INT,   3, 0, 16, signed=True),
+    )
 
 
 class GFX_ITEM(GFX):
@@ -640,89 +498,51 @@ class GFX_ITEM(GFX):
 class SET_MODEL_PART(BaseCommand):
     command_name = "Set Model Part"
     command_size = 8
-    joint_id: DataType.SIGNED_INT
-    model_id: DataType.SIGNED_INT
-
-    def __init__(self, _hex):
-        super().__init__(_hex)
-        w = get_word(_hex)
-        self.joint_id = DataType.SIGNED_INT(sx((w >> 19) & 0x7F, 7))
-        self.model_id = DataType.SIGNED_INT(sx(w & 0x7FFFF, 19))
-
-    def ToHex(self):
-        w = (40 << 26) | ((self.joint_id.GetValue() & 0x7F) << 19) | (self.model_id.GetValue() & 0x7FFFF)
-        return f'{w:08X}'
+    fields = (
+        Field('joint_id', DataType.SIGNED_INT, 0, 19, 7, signed=True),
+        Field('model_id', DataType.SIGNED_INT, 0, 0, 19, signed=True),
+    )
 
 
 class RESET_MODEL_ALL(BaseCommand):
     command_name = "Reset All Model Parts"
     command_size = 8
 
-    def ToHex(self):
-        return _w1(41)
-
 
 class HIDE_MODEL_ALL(BaseCommand):
     command_name = "Hide All Model Parts"
     command_size = 8
 
-    def ToHex(self):
-        return _w1(42)
-
 
 class SET_TEXTURE_PART(BaseCommand):
     """ACY00XX — Y=body part (1 hex digit), XX=texture index (last 2 hex digits)."""
     command_name = "Set Texture Part"
     command_size = 8
-    part: DataType.UNSIGNED_INT
-    index: DataType.UNSIGNED_INT
-
-    def __init__(self, _hex):
-        super().__init__(_hex)
-        self.part = DataType.UNSIGNED_INT(int(_hex[2:3], 16))
-        self.index = DataType.UNSIGNED_INT(int(_hex[6:8], 16))
-
-    def ToHex(self):
-        return self._hex[0:2] + f'{self.part.value:01X}' + '000' + f'{self.index.value:02X}'
+    fields = (
+        Field('part',  DataType.UNSIGNED_INT, 0, 20, 4),
+        Field('index', DataType.UNSIGNED_INT, 0, 0, 8),
+    )
 
 
 class SET_COL_ANIM(BaseCommand):
     command_name = "Set Color Anim"
     command_size = 8
-    color_id: DataType.UNSIGNED_INT
-    length: DataType.UNSIGNED_INT
-
-    def __init__(self, _hex):
-        super().__init__(_hex)
-        w = get_word(_hex)
-        self.color_id = DataType.UNSIGNED_INT((w >> 18) & 0xFF)
-        self.length = DataType.UNSIGNED_INT(w & 0x3FFFF)
-
-    def ToHex(self):
-        w = (44 << 26) | (self.color_id.value << 18) | (self.length.value & 0x3FFFF)
-        return f'{w:08X}'
+    fields = (
+        Field('color_id', DataType.UNSIGNED_INT, 0, 18, 8),
+        Field('length',   DataType.UNSIGNED_INT, 0, 0, 18),
+    )
 
 
 class RESET_COL_ANIM(BaseCommand):
     command_name = "Reset Color Anim"
     command_size = 8
 
-    def ToHex(self):
-        return _w1(45)
-
 
 class SET_PARALLEL_SCRIPT(BaseCommand):
     """SetParallelScript — 2 words, word 2 is a file-relative pointer."""
     command_name = "Set Parallel Script"
     command_size = 16
-    address: DataType.UNSIGNED_INT
-
-    def __init__(self, _hex):
-        super().__init__(_hex)
-        self.address = DataType.UNSIGNED_INT(get_word(_hex, 1))
-
-    def ToHex(self):
-        return _w1(46) + f'{self.address.value:08X}'
+    fields = (Field('address', DataType.UNSIGNED_INT, 1, 0, 32),)
 
 
 # ── Misc ──────────────────────────────────────────────────────────────────────
@@ -730,87 +550,45 @@ class SET_PARALLEL_SCRIPT(BaseCommand):
 class SET_SLOPE_CONTOUR_STATE(BaseCommand):
     command_name = "Set Slope Contour State"
     command_size = 8
-    state: DataType.CONTOUR_STATE
-
-    def __init__(self, _hex):
-        super().__init__(_hex)
-        self.state = DataType.CONTOUR_STATE(get_hex(_hex, 2, 2))
-
-    def ToHex(self):
-        return self._hex[0:2] + f'{self.state.value:06X}'
+    fields = (Field('state', DataType.CONTOUR_STATE, 0, 0, 24),)
 
 
 class HIDE_ITEM(BaseCommand):
     command_name = "Hide Item"
     command_size = 8
-    value: DataType.UNSIGNED_INT
-
-    def __init__(self, _hex):
-        super().__init__(_hex)
-        self.value = DataType.UNSIGNED_INT(get_word(_hex) & 0x3FFFFFF)
-
-    def ToHex(self):
-        return _w1(48, self.value.value)
+    fields = (Field('value', DataType.UNSIGNED_INT, 0, 0, 26),)
 
 
 class MAKE_RUMBLE(BaseCommand):
     command_name = "Make Rumble"
     command_size = 8
-    length: DataType.UNSIGNED_INT
-    rumble_id: DataType.UNSIGNED_INT
-
-    def __init__(self, _hex):
-        super().__init__(_hex)
-        w = get_word(_hex)
-        self.length = DataType.UNSIGNED_INT((w >> 13) & 0x1FFF)
-        self.rumble_id = DataType.UNSIGNED_INT(w & 0x1FFF)
-
-    def ToHex(self):
-        w = (49 << 26) | (self.length.value << 13) | (self.rumble_id.value & 0x1FFF)
-        return f'{w:08X}'
+    fields = (
+        Field('length',    DataType.UNSIGNED_INT, 0, 13, 13),
+        Field('rumble_id', DataType.UNSIGNED_INT, 0, 0, 13),
+    )
 
 
 class STOP_RUMBLE(BaseCommand):
     command_name = "Stop Rumble"
     command_size = 8
 
-    def ToHex(self):
-        return _w1(50)
-
 
 class SWORD_TRAIL(BaseCommand):
     command_name = "Sword Trail"
     command_size = 8
-    command: DataType.SWORD_TRAIL
-
-    def __init__(self, _hex):
-        super().__init__(_hex)
-        self.command = DataType.SWORD_TRAIL(get_hex(_hex, 1, 3))
-
-    def ToHex(self):
-        return self._hex[0:2] + f'{self.command.value:06X}'
+    fields = (Field('command', DataType.SWORD_TRAIL, 0, 0, 24),)
 
 
 # ── Remix-specific commands ───────────────────────────────────────────────────
 
 class SET_FRAME_SPEED_MULTIPLIER(BaseCommand):
+    """D0 XX YYYY — XX=speed flag, YYYY=multiplier (upper 2 bytes of a float32)."""
     command_name = "Set Frame Speed Multiplier (Remix)"
     command_size = 8
-    speed_flag: DataType.UNSIGNED_INT
-    fsm: DataType.FLOAT32
-
-    def __init__(self, _hex: str):
-        super().__init__(_hex)
-        self.speed_flag = DataType.UNSIGNED_INT(bytes.fromhex(_hex[2:4]))
-        # Read 2 big-endian bytes, pad with 2 zero bytes to form a 4-byte float
-        fsm_bytes = bytes.fromhex(_hex[4:8]) + b'\x00\x00'
-        self.fsm = DataType.FLOAT32(fsm_bytes)
-
-    def ToHex(self):
-        sf_hex = f"{self.speed_flag.GetValue():02X}"
-        # Store only the 2 most significant bytes of the float
-        fsm_hex = self.fsm.ToBytes()[:2].hex().upper()
-        return self._hex[0:2] + sf_hex + fsm_hex
+    fields = (
+        Field('speed_flag', DataType.UNSIGNED_INT, 0, 16, 8),
+        Field('fsm',        DataType.FLOAT32,      0, 0, 16),
+    )
 
 
 # ── Remix commands ────────────────────────────────────────────────────────────
@@ -818,14 +596,7 @@ class SET_FRAME_SPEED_MULTIPLIER(BaseCommand):
 
 class _UpperFloat(BaseCommand):
     command_size = 8
-    value: DataType.FLOAT32
-
-    def __init__(self, _hex: str):
-        super().__init__(_hex)
-        self.value = DataType.FLOAT32(bytes.fromhex(_hex[4:8]) + b'\x00\x00')
-
-    def ToHex(self):
-        return self._hex[0:2] + '00' + self.value.ToBytes()[:2].hex().upper()
+    fields = (Field('value', DataType.FLOAT32, 0, 0, 16),)
 
 
 class SET_ARMOR(_UpperFloat):
@@ -848,20 +619,11 @@ class SET_Y_VEL(_UpperFloat):
 
 class _HitboxMultiplier(BaseCommand):
     command_size = 8
-    apply_all: DataType.BOOL_TOGGLE
-    hitbox_id: DataType.UNSIGNED_INT
-    multiplier: DataType.FLOAT32
-
-    def __init__(self, _hex: str):
-        super().__init__(_hex)
-        xy = int(_hex[2:4], 16)
-        self.apply_all = DataType.BOOL_TOGGLE((xy >> 4) & 0xF)
-        self.hitbox_id = DataType.UNSIGNED_INT(xy & 0xF)
-        self.multiplier = DataType.FLOAT32(bytes.fromhex(_hex[4:8]) + b'\x00\x00')
-
-    def ToHex(self):
-        xy = ((self.apply_all.value & 0xF) << 4) | (self.hitbox_id.value & 0xF)
-        return self._hex[0:2] + f'{xy:02X}' + self.multiplier.ToBytes()[:2].hex().upper()
+    fields = (
+        Field('apply_all',  DataType.BOOL_TOGGLE,  0, 20, 4),
+        Field('hitbox_id',  DataType.UNSIGNED_INT, 0, 16, 4),
+        Field('multiplier', DataType.FLOAT32,      0, 0, 16),
+    )
 
 
 class SET_HITBOX_HITLAG_MULT(_HitboxMultiplier):
@@ -878,100 +640,54 @@ class OVERRIDE_HITBOX_DIRECTION(BaseCommand):
     """D2 00 XX YY — XX=hitbox_id (0-3), YY=direction override."""
     command_name = "Override Hitbox Direction (Remix)"
     command_size = 8
-    hitbox_id: DataType.UNSIGNED_INT
-    direction: DataType.HITBOX_DIR_OVERRIDE
-
-    def __init__(self, _hex: str):
-        super().__init__(_hex)
-        self.hitbox_id = DataType.UNSIGNED_INT(int(_hex[4:6], 16))
-        self.direction = DataType.HITBOX_DIR_OVERRIDE(int(_hex[6:8], 16))
-
-    def ToHex(self):
-        return self._hex[0:2] + '00' + f'{self.hitbox_id.value:02X}{self.direction.value:02X}'
+    fields = (
+        Field('hitbox_id', DataType.UNSIGNED_INT,        0, 8, 8),
+        Field('direction', DataType.HITBOX_DIR_OVERRIDE, 0, 0, 8),
+    )
 
 
 class FAST_FALL(BaseCommand):
     """D5 00 00 XX — XX=0 off, 1 on."""
     command_name = "Fast Fall (Remix)"
     command_size = 8
-    enabled: DataType.BOOL_TOGGLE
-
-    def __init__(self, _hex: str):
-        super().__init__(_hex)
-        self.enabled = DataType.BOOL_TOGGLE(int(_hex[6:8], 16))
-
-    def ToHex(self):
-        return self._hex[0:2] + '0000' + f'{self.enabled.value:02X}'
+    fields = (Field('enabled', DataType.BOOL_TOGGLE, 0, 0, 8),)
 
 
 class RANDOM_SFX(BaseCommand):
     """D6 XX YY ZZ / AAAAAAAA — chance, sfx_type, array_size, pointer. (2 words)"""
     command_name = "Random SFX (Remix)"
     command_size = 16
-    chance: DataType.UNSIGNED_INT
-    sfx_type: DataType.SFX_PLAY_TYPE
-    array_size: DataType.UNSIGNED_INT
-    pointer: DataType.UNSIGNED_INT
-
-    def __init__(self, _hex: str):
-        super().__init__(_hex)
-        self.chance     = DataType.UNSIGNED_INT(int(_hex[2:4], 16))
-        self.sfx_type   = DataType.SFX_PLAY_TYPE(int(_hex[4:6], 16))
-        self.array_size = DataType.UNSIGNED_INT(int(_hex[6:8], 16))
-        self.pointer    = DataType.UNSIGNED_INT(int(_hex[8:16], 16))
-
-    def ToHex(self):
-        return (self._hex[0:2]
-                + f'{self.chance.value:02X}{self.sfx_type.value:02X}{self.array_size.value:02X}'
-                + f'{self.pointer.value:08X}')
+    fields = (
+        Field('chance',     DataType.UNSIGNED_INT,  0, 16, 8),
+        Field('sfx_type',   DataType.SFX_PLAY_TYPE, 0, 8, 8),
+        Field('array_size', DataType.UNSIGNED_INT,  0, 0, 8),
+        Field('pointer',    DataType.UNSIGNED_INT,  1, 0, 32),
+    )
 
 
 class SET_KINETIC_STATE(BaseCommand):
     """D7 00 00 XX — XX=0 grounded, 1 aerial."""
     command_name = "Set Kinetic State (Remix)"
     command_size = 8
-    state: DataType.KINETIC_STATE
-
-    def __init__(self, _hex: str):
-        super().__init__(_hex)
-        self.state = DataType.KINETIC_STATE(int(_hex[6:8], 16))
-
-    def ToHex(self):
-        return self._hex[0:2] + '0000' + f'{self.state.value:02X}'
+    fields = (Field('state', DataType.KINETIC_STATE, 0, 0, 8),)
 
 
 class SET_HITBOX_FGM(BaseCommand):
     """D8 XY ZZZZ — X=apply_all, Y=hitbox_id, ZZZZ=fgm_id (high bit=play both)."""
     command_name = "Set Hitbox FGM (Remix)"
     command_size = 8
-    apply_all: DataType.BOOL_TOGGLE
-    hitbox_id: DataType.UNSIGNED_INT
-    fgm_id: DataType.SFX
-
-    def __init__(self, _hex: str):
-        super().__init__(_hex)
-        xy = int(_hex[2:4], 16)
-        self.apply_all = DataType.BOOL_TOGGLE((xy >> 4) & 0xF)
-        self.hitbox_id = DataType.UNSIGNED_INT(xy & 0xF)
-        self.fgm_id    = DataType.SFX(int(_hex[4:8], 16))
-
-    def ToHex(self):
-        xy = ((self.apply_all.value & 0xF) << 4) | (self.hitbox_id.value & 0xF)
-        return self._hex[0:2] + f'{xy:02X}' + f'{self.fgm_id.value:04X}'
+    fields = (
+        Field('apply_all', DataType.BOOL_TOGGLE,  0, 20, 4),
+        Field('hitbox_id', DataType.UNSIGNED_INT, 0, 16, 4),
+        Field('fgm_id',    DataType.SFX,          0, 0, 16),
+    )
 
 
 class SET_ENV_COLOR(BaseCommand):
     """D9 00 00 00 / XXXXXXXX — env color as 32-bit RGBA. (2 words)"""
     command_name = "Set Env Color (Remix)"
     command_size = 16
-    color: DataType.UNSIGNED_INT
-
-    def __init__(self, _hex: str):
-        super().__init__(_hex)
-        self.color = DataType.UNSIGNED_INT(int(_hex[8:16], 16))
-
-    def ToHex(self):
-        return self._hex[0:2] + '000000' + f'{self.color.value:08X}'
+    fields = (Field('color', DataType.UNSIGNED_INT, 1, 0, 32),)
 
 
 class SWITCH_DIRECTION(BaseCommand):
@@ -979,47 +695,40 @@ class SWITCH_DIRECTION(BaseCommand):
     command_name = "Switch Direction (Remix)"
     command_size = 8
 
-    def ToHex(self):
-        return self._hex[0:2] + '000000'
-
 
 class GO_TO_MOVESET_FILE(BaseCommand):
     """DB 00 XXXX — jump to word offset XXXX in the parent moveset file."""
     command_name = "Go To Moveset File (Remix)"
     command_size = 8
-    offset: DataType.UNSIGNED_INT
-
-    def __init__(self, _hex: str):
-        super().__init__(_hex)
-        self.offset = DataType.UNSIGNED_INT(int(_hex[4:8], 16))
-
-    def ToHex(self):
-        return self._hex[0:2] + '00' + f'{self.offset.value:04X}'
+    fields = (Field('offset', DataType.UNSIGNED_INT, 0, 0, 16),)
 
 
 class L_VOICE_SFX(BaseCommand):
     """DC 00 AAAA / 0000 BBBB — AAAA=normal sfx, BBBB=alternate if L held. (2 words)"""
     command_name = "L Voice SFX (Remix)"
     command_size = 16
-    sfx: DataType.SFX
-    alt_sfx: DataType.SFX
-
-    def __init__(self, _hex: str):
-        super().__init__(_hex)
-        self.sfx     = DataType.SFX(int(_hex[4:8], 16))
-        self.alt_sfx = DataType.SFX(int(_hex[12:16], 16))
-
-    def ToHex(self):
-        return (self._hex[0:2] + '00' + f'{self.sfx.value:04X}'
-                + '0000' + f'{self.alt_sfx.value:04X}')
+    fields = (
+        Field('sfx',     DataType.SFX, 0, 0, 16),
+        Field('alt_sfx', DataType.SFX, 1, 0, 16),
+    )
 
 
 # ── Unknown ───────────────────────────────────────────────────────────────────
 
 class UNKNOWN(BaseCommand):
-    command_name = "???"
+    """Any first byte without a known command. The parser names each instance
+    after its byte, so the name is stored per instance."""
+    __slots__ = ('_name',)
     command_size = 8
 
+    @property
+    def command_name(self):
+        return getattr(self, '_name', "???")
+
+    @command_name.setter
+    def command_name(self, value):
+        self._name = value
+
 
 # ── Lookup tables ─────────────────────────────────────────────────────────────
 
@@ -1113,9 +822,244 @@ COMMANDS['0C'] = HITBOX
 COMMANDS.update({f'{byte:02X}': cls for byte, cls in _REMIX.items()})
 
 
-def GetCommand(code: str) -> type:
-    first_byte = int(code, 16)
-    opcode = first_byte >> 2
-    if opcode < 52:
-        return _VANILLA.get(opcode, UNKNOWN)
-    return _REMIX.get(first_byte, UNKNOWN)
+class OpcodeEntry(NamedTuple):
+    """Everything the parser needs to know about one first-byte value."""
+    cls: type
+    byte_size: int
+    decode: object  # callable(bytes-like) -> BaseCommand
+
+
+def _unknown_decoder(first_byte):
+    name = f'{first_byte:02X}'
+
+    def decode(data):
+        comm = UNKNOWN(data)
+        comm.command_name = name
+        return comm
+    return decode
+
+
+def _build_opcode_table() -> list:
+    table = []
+    for first_byte in range(256):
+        opcode = first_byte >> 2
+        if opcode < 52:
+            cls = _VANILLA.get(opcode, UNKNOWN)
+        else:
+            cls = _REMIX.get(first_byte, UNKNOWN)
+        decode = _unknown_decoder(first_byte) if cls is UNKNOWN else cls
+        table.append(OpcodeEntry(cls, cls.command_size // 2, decode))
+    return table
+
+
+# Raw first byte → OpcodeEntry, precomputed for all 256 values so the parser's
+# inner loop is a single list index.
+OPCODE_TABLE: list = _build_opcode_table()
+
+
+def GetCommand(code) -> type:
+    """Look up a command class by its first byte, given as an int or a hex string."""
+    if not isinstance(code, int):
+        code = int(code, 16)
+    return OPCODE_TABLE[code].cls
+
+
+class CommandView:
+    """A located but undecoded command: the offset and raw bytes are recorded
+    up front, and the command is only decoded the first time one of its fields
+    (or anything else not defined here) is accessed. The raw bytes are a
+    memoryview into the parsed buffer, not a copy."""
+    __slots__ = ('offset', 'raw', '_command')
+
+    def __init__(self, offset: int, raw):
+        self.offset = offset
+        self.raw = raw
+        self._command = None
+
+    @property
+    def first_byte(self) -> int:
+        return self.raw[0]
+
+    @property
+    def cls(self) -> type:
+        return OPCODE_TABLE[self.raw[0]].cls
+
+    @property
+    def command_name(self) -> str:
+        if self._command is not None:
+            return self._command.command_name
+        cls = self.cls
+        return f'{self.raw[0]:02X}' if cls is UNKNOWN else cls.command_name
+
+    @property
+    def command_size(self) -> int:
+        return len(self.raw) * 2
+
+    @property
+    def command(self) -> BaseCommand:
+        if self._command is None:
+            self._command = OPCODE_TABLE[self.raw[0]].decode(self.raw)
+        return self._command
+
+    def __getattr__(self, name):
+        return getattr(self.command, name)
+
+    def __repr__(self):
+        return f'<CommandView {self.command_name} @ {self.offset:#x}>'
+
+
+def ParseMoveset(data, lazy=False) -> list:
+    """Decode a moveset script from a bytes-like object (bytes, bytearray, mmap
+    or memoryview). Decoding stops at the first command that would run past the
+    end of the buffer.
+
+    With lazy=True the result holds CommandView objects instead, which only
+    decode a command when its fields are first read."""
+    view = memoryview(data)
+    end = len(view)
+    table = OPCODE_TABLE
+    commands = []
+    pos = 0
+    while pos < end:
+        _, size, decode = table[view[pos]]
+        if pos + size > end:
+            break
+        raw = view[pos:pos+size]
+        commands.append(CommandView(pos, raw) if lazy else decode(raw))
+        pos += size
+    return commands
+
+
+def EncodeMoveset(commands) -> bytearray:
+    """Serialise a command list into one preallocated bytearray."""
+    buf = bytearray(sum(comm.command_size for comm in commands) // 2)
+    pos = 0
+    for comm in commands:
+        pos = comm.WriteInto(buf, pos)
+    return buf
+
+
+def IterMoveset(fileobj, offset=0, stop_at_end=False, chunk_size=1 << 16):
+    """Decode a moveset script from a binary file object, yielding
+    (file_offset, command) pairs as soon as each command has been read.
+
+    Reading starts at `offset` and proceeds in `chunk_size` reads, so memory
+    use stays constant however large the file is. With stop_at_end=True the
+    MOVESET_END command is the last one yielded.
+
+    Non-seekable streams (pipes, sockets) work too: with offset 0 nothing is
+    seeked, and a non-zero offset is reached by reading and discarding."""
+    if offset:
+        if getattr(fileobj, "seekable", lambda: False)():
+            fileobj.seek(offset)
+        else:
+            skip = offset
+            while skip:
+                chunk = fileobj.read(min(skip, chunk_size))
+                if not chunk:
+                    return
+                skip -= len(chunk)
+    table = OPCODE_TABLE
+    buf = bytearray()
+    base = offset  # file offset of buf[0]
+    pos = 0
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if chunk:
+            buf += chunk
+        while pos < len(buf):
+            cls, size, decode = table[buf[pos]]
+            if pos + size > len(buf):
+                break
+            yield base + pos, decode(buf[pos:pos+size])
+            if stop_at_end and cls is MOVESET_END:
+                return
+            pos += size
+        if not chunk:
+            return
+        del buf[:pos]
+        base += pos
+        pos = 0
+
+
+def _common_prefix(a, b) -> int:
+    """Length of the common prefix of two bytes-like objects."""
+    n = min(len(a), len(b))
+    i, step = 0, 4096
+    while i < n and a[i:i+step] == b[i:i+step]:
+        i += step
+    while i < n and a[i] == b[i]:
+        i += 1
+    return min(i, n)
+
+
+def _common_suffix(a, b, limit) -> int:
+    """Length of the common suffix of two bytes-like objects, at most `limit`."""
+    la, lb = len(a), len(b)
+    i, step = 0, 4096
+    while i + step <= limit and a[la-i-step:la-i] == b[lb-i-step:lb-i]:
+        i += step
+    while i < limit and a[la-i-1] == b[lb-i-1]:
+        i += 1
+    return min(i, limit)
+
+
+def DiffMoveset(commands: list, offsets: list, old_data, new_data) -> tuple:
+    """Work out how `commands` and their byte `offsets`, previously parsed
+    from old_data, change with new_data, without touching either list.
+
+    Only the commands from the first one touched by the edit are re-decoded,
+    and decoding stops as soon as the new stream lands on the start of an old
+    command lying entirely in the unchanged tail. Returns (start, stop,
+    new_commands, new_offsets): commands[start:stop] give way to new_commands
+    at new_offsets, and the commands from stop onwards move by
+    len(new_data) - len(old_data) bytes."""
+    old_len, new_len = len(old_data), len(new_data)
+    prefix = _common_prefix(old_data, new_data)
+    if prefix == old_len == new_len:
+        return 0, 0, [], []
+    suffix = _common_suffix(old_data, new_data, min(old_len, new_len) - prefix)
+    delta = new_len - old_len
+    n = len(commands)
+
+    parsed_end = offsets[-1] + len(commands[-1]._data) if n else 0
+    if prefix >= parsed_end:
+        start, pos = n, parsed_end
+    else:
+        start = bisect.bisect_right(offsets, prefix) - 1
+        pos = offsets[start]
+    # Old commands from index j onwards start inside the unchanged tail.
+    j = bisect.bisect_left(offsets, old_len - suffix, start)
+
+    view = memoryview(new_data)
+    table = OPCODE_TABLE
+    new_commands, new_offsets = [], []
+    stop = n
+    while pos < new_len:
+        while j < n and offsets[j] + delta < pos:
+            j += 1
+        if j < n and offsets[j] + delta == pos:
+            stop = j
+            break
+        _, size, decode = table[view[pos]]
+        if pos + size > new_len:
+            break
+        new_commands.append(decode(view[pos:pos+size]))
+        new_offsets.append(pos)
+        pos += size
+    return start, stop, new_commands, new_offsets
+
+
+def ReparseMoveset(commands: list, offsets: list, old_data, new_data) -> tuple:
+    """Bring `commands` and their byte `offsets`, previously parsed from
+    old_data, up to date with new_data in place (see DiffMoveset). Returns
+    (start, removed, added): commands[start:start+removed] were replaced by
+    `added` commands."""
+    start, stop, new_commands, new_offsets = DiffMoveset(commands, offsets, old_data, new_data)
+    commands[start:stop] = new_commands
+    offsets[start:stop] = new_offsets
+    delta = len(new_data) - len(old_data)
+    if delta:
+        tail = start + len(new_offsets)
+        offsets[tail:] = [o + delta for o in offsets[tail:]]
+    return start, stop - start, len(new_commands)
@@ -0,0 +1,170 @@
+"""Basic-block control-flow graph of a moveset file.
+
+Addresses in GOTO and SUBROUTINE are file-relative word offsets;
+GO_TO_MOVESET_FILE jumps to a word offset in the parent moveset file, which
+is outside the file being analysed and is recorded as an external edge.
+LOOP_START/LOOP_END pairs are matched by nesting: LOOP_END branches back to
+the first command after its LOOP_START or falls out of the loop.
+
+    cfg = BuildCFG(data)
+    for block in cfg.blocks: ...
+    cfg.DeadBlocks()        # blocks no entry point can reach
+
+Graphs are cached by the SHA-1 of the file contents, so asking again for an
+unchanged file is a dictionary lookup.
+"""
+import hashlib
+from collections import OrderedDict
+from typing import NamedTuple
+
+import Command
+
+
+class Edge(NamedTuple):
+    kind: str          # 'fall', 'jump', 'call', 'loop', 'exit', 'return' or 'external'
+    target: int        # index into ControlFlowGraph.blocks, None if unresolved/none
+    byte_offset: int   # target byte offset in the file (parent file for 'external')
+
+
+class BasicBlock(NamedTuple):
+    start: int         # index of the first command
+    end: int           # index one past the last command
+    edges: tuple       # outgoing Edge tuples
+
+
+# Commands after which control never falls through to the next command.
+_NO_FALLTHROUGH = frozenset((Command.MOVESET_END, Command.GOTO, Command.RETURN,
+                             Command.GO_TO_MOVESET_FILE))
+# Commands that end a basic block.
+_BLOCK_END = _NO_FALLTHROUGH | {Command.SUBROUTINE, Command.LOOP_END}
+
+
+class ControlFlowGraph:
+    __slots__ = ('commands', 'offsets', 'blocks', 'entries', 'unresolved', '_block_of')
+
+    def __init__(self, commands, offsets, blocks, entries, unresolved):
+        self.commands = commands        # decoded commands, shared; do not mutate
+        self.offsets = offsets          # byte offset of each command
+        self.blocks = blocks            # tuple of BasicBlock, in file order
+        self.entries = entries          # block indices the analysis started from
+        self.unresolved = unresolved    # (command index, target byte offset) pairs
+        block_of = [0] * len(commands)
+        for i, block in enumerate(blocks):
+            block_of[block.start:block.end] = [i] * (block.end - block.start)
+        self._block_of = block_of
+
+    def BlockOf(self, command_index) -> int:
+        """Index of the block containing a command."""
+        return self._block_of[command_index]
+
+    def Reachable(self) -> set:
+        """Blocks reachable from the entry points, following calls into
+        subroutines as well as jumps and fall-throughs."""
+        seen = set(self.entries)
+        stack = list(self.entries)
+        while stack:
+            for edge in self.blocks[stack.pop()].edges:
+                if edge.target is not None and edge.target not in seen:
+                    seen.add(edge.target)
+                    stack.append(edge.target)
+        return seen
+
+    def DeadBlocks(self) -> list:
+        reachable = self.Reachable()
+        return [i for i in range(len(self.blocks)) if i not in reachable]
+
+    def Predecessors(self) -> list:
+        """For each block, the (source block, Edge) pairs that lead to it."""
+        preds = [[] for _ in self.blocks]
+        for i, block in enumerate(self.blocks):
+            for edge in block.edges:
+                if edge.target is not None:
+                    preds[edge.target].append((i, edge))
+        return preds
+
+
+def _Build(data, entry_offsets) -> ControlFlowGraph:
+    commands = Command.ParseMoveset(data)
+    offsets = []
+    pos = 0
+    for comm in commands:
+        offsets.append(pos)
+        pos += comm.command_size // 2
+    index_of = {offset: i for i, offset in enumerate(offsets)}
+    n = len(commands)
+
+    # Pass 1: resolve targets, pair loops and collect block leaders.
+    leaders = {0} if n else set()
+    targets = {}                # command index -> (target command index or None, byte offset)
+    loop_body = {}              # LOOP_END index -> first command index of its body
+    open_loops = []
+    for i, comm in enumerate(commands):
+        cls = type(comm)
+        if cls is Command.GOTO or cls is Command.SUBROUTINE:
+            byte_offset = comm.address.value * 4
+            target = index_of.get(byte_offset)
+            targets[i] = (target, byte_offset)
+            if target is not None:
+                leaders.add(target)
+        elif cls is Command.LOOP_START:
+            open_loops.append(i + 1)
+            leaders.add(i + 1)
+        elif cls is Command.LOOP_END and open_loops:
+            loop_body[i] = open_loops.pop()
+        if cls in _BLOCK_END:
+            leaders.add(i + 1)
+    for offset in entry_offsets:
+        if offset in index_of:
+            leaders.add(index_of[offset])
+    starts = sorted(s for s in leaders if s < n)
+    block_at = {start: b for b, start in enumerate(starts)}
+
+    # Pass 2: one block per leader, with edges decided by its last command.
+    blocks, unresolved = [], []
+    for b, start in enumerate(starts):
+        end = starts[b + 1] if b + 1 < len(starts) else n
+        last = end - 1
+        comm = commands[last]
+        cls = type(comm)
+        next_offset = offsets[end] if end < n else pos
+        edges = []
+        if cls is Command.GOTO or cls is Command.SUBROUTINE:
+            target, byte_offset = targets[last]
+            if target is None:
+                unresolved.append((last, byte_offset))
+            edges.append(Edge('jump' if cls is Command.GOTO else 'call',
+                              None if target is None else block_at[target], byte_offset))
+        elif cls is Command.RETURN:
+            edges.append(Edge('return', None, None))
+        elif cls is Command.GO_TO_MOVESET_FILE:
+            edges.append(Edge('external', None, comm.offset.value * 4))
+        elif cls is Command.LOOP_END and last in loop_body and loop_body[last] < n:
+            body = loop_body[last]
+            edges.append(Edge('loop', block_at[body], offsets[body]))
+        if cls not in _NO_FALLTHROUGH and end < n:
+            kind = 'exit' if cls is Command.LOOP_END else 'fall'
+            edges.append(Edge(kind, block_at[end], next_offset))
+        blocks.append(BasicBlock(start, end, tuple(edges)))
+
+    entries = tuple(sorted({block_at[index_of[o]] for o in entry_offsets if o in index_of}))
+    return ControlFlowGraph(commands, offsets, tuple(blocks), entries, tuple(unresolved))
+
+
+_CACHE_SIZE = 64
+_cache = OrderedDict()
+
+
+def BuildCFG(data, entry_offsets=(0,)) -> ControlFlowGraph:
+    """Control-flow graph of the moveset file in `data` (any bytes-like
+    object), analysed from the given byte offsets. Results are memoized by
+    content hash and shared between callers, so treat them as read-only."""
+    entry_offsets = tuple(entry_offsets)
+    key = (hashlib.sha1(data).digest(), entry_offsets)
+    cfg = _cache.get(key)
+    if cfg is not None:
+        _cache.move_to_end(key)
+        return cfg
+    cfg = _cache[key] = _Build(bytes(data), entry_offsets)
+    if len(_cache) > _CACHE_SIZE:
+        _cache.popitem(last=False)
+    return cfg
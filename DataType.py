@@ -2,13 +2,70 @@ from typing import NamedTuple
 from enum import Enum, auto
 from dataclasses import dataclass
 from abc import ABC, abstractmethod
+import hashlib
+import json
+import os
 import re
 import struct
 
+class Template(dict):
+    """label → value mapping that also maintains a value → label index, so
+    GetLabel is a single lookup. When several labels share a value the first
+    one inserted wins, as with a linear search over the values."""
+    __slots__ = ('_labels',)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._labels = None
+
+    def Label(self, value, default=None):
+        labels = self._labels
+        if labels is None:
+            labels = {}
+            for k, v in self.items():
+                labels.setdefault(v, k)
+            self._labels = labels
+        return labels.get(value, default)
+
+    def __setitem__(self, key, value):
+        labels = self._labels
+        if labels is not None and key not in self:
+            labels.setdefault(value, key)
+        else:
+            self._labels = None
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self._labels = None
+        super().__delitem__(key)
+
+    def _invalidating(name):
+        def method(self, *args, **kwargs):
+            self._labels = None
+            return getattr(dict, name)(self, *args, **kwargs)
+        method.__name__ = name
+        return method
+
+    update = _invalidating('update')
+    pop = _invalidating('pop')
+    popitem = _invalidating('popitem')
+    clear = _invalidating('clear')
+    setdefault = _invalidating('setdefault')
+    __ior__ = _invalidating('__ior__')
+    del _invalidating
+
+
 class BASE_TYPE(ABC):
-    value: int = 0
+    __slots__ = ('value',)
+    value: int
     template: dict = None
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        template = cls.__dict__.get('template')
+        if template is not None and not isinstance(template, Template):
+            cls.template = Template(template)
+
     def __init__(self, value) -> None:
         self.SetValue(value)
 
@@ -18,11 +75,8 @@ class BASE_TYPE(ABC):
 
     def GetLabel(self):
         if self.template is not None:
-            try:
-                idx = list(self.template.values()).index(self.value)
-                return list(self.template.keys())[idx]
-            except ValueError:
-                return str(self.value)
+            label = self.template.Label(self.value)
+            return str(self.value) if label is None else label
 
     def GetLabelValue(self, label):
         if self.template is not None:
@@ -31,6 +85,7 @@ class BASE_TYPE(ABC):
 
 class SIGNED_INT(BASE_TYPE):
     """Example for 2-byte signed int"""
+    __slots__ = ()
     def SetValue(self, value) -> None:
         if isinstance(value, bytes):
             self.value = int.from_bytes(value, byteorder="little", signed=False)
@@ -46,6 +101,7 @@ class SIGNED_INT(BASE_TYPE):
 
 class SIGNED_INT3(BASE_TYPE):
     """Example for 10-bit signed int (packed in 2 bytes)"""
+    __slots__ = ()
     def SetValue(self, value) -> None:
         if isinstance(value, bytes):
             raw = int.from_bytes(value, byteorder="little", signed=False)
@@ -62,6 +118,7 @@ class SIGNED_INT3(BASE_TYPE):
 
 class UNSIGNED_INT(BASE_TYPE):
     """Example for 4-byte unsigned int"""
+    __slots__ = ()
     def SetValue(self, value) -> None:
         if isinstance(value, bytes):
             self.value = int.from_bytes(value, byteorder="little", signed=False)
@@ -72,6 +129,7 @@ class UNSIGNED_INT(BASE_TYPE):
         return self.value
 
 class FLOAT32(BASE_TYPE):
+    __slots__ = ()
     def SetValue(self, value) -> None:
         if isinstance(value, bytes):
             if len(value) != 4:
@@ -87,6 +145,7 @@ class FLOAT32(BASE_TYPE):
         return struct.pack('>f', float(self.value))  # big endian
 
 class HURTBOX_STATE(UNSIGNED_INT):
+    __slots__ = ()
     template = {
         "?": 0,
         "VULNERABLE": 1,
@@ -96,6 +155,7 @@ class HURTBOX_STATE(UNSIGNED_INT):
 
 
 class SOUND_LEVEL(UNSIGNED_INT):
+    __slots__ = ()
     template = {
         "S": 0,
         "M": 1,
@@ -105,6 +165,7 @@ class SOUND_LEVEL(UNSIGNED_INT):
 
 
 class SFX(UNSIGNED_INT):
+    __slots__ = ()
     template = {
         "L WHOOSH":	41,
         "M WHOOSH":	42,
@@ -116,6 +177,7 @@ class SFX(UNSIGNED_INT):
 
 
 class SOUND_TYPE(UNSIGNED_INT):
+    __slots__ = ()
     template = {
         "PUNCH": 0,
         "KICK": 1,
@@ -129,6 +191,7 @@ class SOUND_TYPE(UNSIGNED_INT):
 
 
 class EFFECT_TYPE(UNSIGNED_INT):
+    __slots__ = ()
     template = {
         "NORMAL": 0,
         "FLAME": 1,
@@ -140,6 +203,7 @@ class EFFECT_TYPE(UNSIGNED_INT):
 
 
 class CONTOUR_STATE(UNSIGNED_INT):
+    __slots__ = ()
     template = {
         "NONE": 0,
         "[1]": 1,
@@ -153,6 +217,7 @@ class CONTOUR_STATE(UNSIGNED_INT):
 
 
 class SWORD_TRAIL(UNSIGNED_INT):
+    __slots__ = ()
     template = {
         "LINK": 0,
         "END": 262143
@@ -160,6 +225,7 @@ class SWORD_TRAIL(UNSIGNED_INT):
 
 
 class GFX(UNSIGNED_INT):
+    __slots__ = ()
     template = {
         "FOOTSTEP SMOKE": 11,
         "JUMP SMOKE": 13,
@@ -177,52 +243,126 @@ class GFX(UNSIGNED_INT):
 
 
 class BOOL_TOGGLE(UNSIGNED_INT):
+    __slots__ = ()
     template = {"Off": 0, "On": 1}
 
 
 class KINETIC_STATE(UNSIGNED_INT):
+    __slots__ = ()
     template = {"Grounded": 0, "Aerial": 1}
 
 
 class HITBOX_DIR_OVERRIDE(UNSIGNED_INT):
+    __slots__ = ()
     template = {"No Override": 0, "Force Forward": 1, "Force Backward": 2}
 
 
 class SFX_PLAY_TYPE(UNSIGNED_INT):
+    __slots__ = ()
     template = {"SFX": 0, "Voice FX": 1}
 
 
-def LoadRemixStuff():
+# Remix build log lines that declare new IDs. An FGM_ID line names the sound
+# added on the line before it.
+_LOG_FGM = re.compile(r"FGM_ID: 0x\w+ \((.*)\)")
+_LOG_DAMAGE = re.compile(r"Added Damage Type: (\w+) - ID is (\w+)$")
+_LOG_GFX = re.compile(r" - Added GFX_ID (\w+) \(Command ID \w+\) with Instruction ID \w+\): (.*)$")
+_LOG_TRAIL = re.compile(r"Added Sword Trail: (\w+) - Moveset command is (.*)$")
+
+_REMIX_TEMPLATES = {"SFX": SFX, "EFFECT_TYPE": EFFECT_TYPE, "GFX": GFX, "SWORD_TRAIL": SWORD_TRAIL}
+_REMIX_CACHE_VERSION = 1
+
+
+def _ParseRemixLog(f) -> tuple:
+    """Extract every Remix symbol from a binary log file in one pass.
+    Returns ({template name: [(label, value), ...]}, sha1 hex digest)."""
+    symbols = {name: [] for name in _REMIX_TEMPLATES}
+    digest = hashlib.sha1()
+    prev = ""
+    for raw in f:
+        digest.update(raw)
+        line = raw.decode("utf-8", "replace").rstrip("\r\n")
+        try:
+            if line.startswith("FGM_ID"):
+                m = _LOG_FGM.match(line)
+                added = prev.find("Added ")
+                if m and added >= 0:
+                    symbols["SFX"].append((prev[added+6:], int(m[1])))
+            elif "Added " in line:
+                if m := _LOG_DAMAGE.search(line):
+                    symbols["EFFECT_TYPE"].append((m[1], int(m[2], 16)))
+                elif m := _LOG_GFX.search(line):
+                    symbols["GFX"].append((m[2], int(m[1], 16)))
+                elif m := _LOG_TRAIL.search(line):
+                    symbols["SWORD_TRAIL"].append((m[1], int(m[2][4:], 16)))
+        except ValueError:
+            pass
+        prev = line
+    return symbols, digest.hexdigest()
+
+
+def _HashFile(path, chunk_size=1 << 20) -> str:
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _ReadRemixCache(cache_path, size) -> dict:
+    """The cache at `cache_path` if it is current and was written for a log of
+    `size` bytes. None if it is missing, stale or not shaped as expected."""
     try:
-        buildlog = open("./output.log", 'r').read()
-
-        # SFX
-        pattern = re.compile(r"Added (.*)\nFGM_ID: 0x\w+ \((.*)\)")
-
-        for match in re.findall(pattern, buildlog):
-            SFX.template[match[0]] = int(match[1])
-
-        # Damage type
-        pattern = re.compile(r"Added Damage Type: (\w+) - ID is (\w+)\n")
-
-        for match in re.findall(pattern, buildlog):
-            EFFECT_TYPE.template[match[0]] = int(match[1], 16)
-
-        # GFX
-        pattern = re.compile(
-            r" - Added GFX_ID (\w+) \(Command ID \w+\) with Instruction ID \w+\): (.*)\n")
-
-        for match in re.findall(pattern, buildlog):
-            GFX.template[match[1]] = int(match[0], 16)
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+        if cache["version"] != _REMIX_CACHE_VERSION or cache["size"] != size:
+            return None
+        if not {"mtime_ns", "sha1"} <= cache.keys() or not cache["symbols"].keys() <= _REMIX_TEMPLATES.keys():
+            return None
+        for entries in cache["symbols"].values():
+            for label, value in entries:
+                if not isinstance(label, str) or not isinstance(value, int):
+                    return None
+        return cache
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+def _LoadRemixSymbols(path) -> dict:
+    """Symbols for the log at `path`, from `path`.symbols.json when that cache
+    was written for the same file (same size and mtime, or same content hash)
+    and from a fresh parse otherwise."""
+    stat = os.stat(path)
+    cache_path = path + ".symbols.json"
+    cache = _ReadRemixCache(cache_path, stat.st_size)
+    if cache is not None and cache["mtime_ns"] == stat.st_mtime_ns:
+        return cache["symbols"]
+
+    # Only the mtime moved? Hashing is much cheaper than parsing.
+    sha1 = _HashFile(path) if cache is not None else None
+    if sha1 is not None and sha1 == cache["sha1"]:
+        symbols = cache["symbols"]
+    else:
+        with open(path, "rb") as f:
+            symbols, sha1 = _ParseRemixLog(f)
+    try:
+        with open(cache_path, "w", encoding="utf-8") as f:
+            json.dump({"version": _REMIX_CACHE_VERSION, "size": stat.st_size,
+                       "mtime_ns": stat.st_mtime_ns, "sha1": sha1, "symbols": symbols}, f)
+    except OSError:
+        pass  # a read-only install just parses the log every time
+    return symbols
 
-        # SWORD TRAILS
-        pattern = re.compile(
-            r"Added Sword Trail: (\w+) - Moveset command is (.*)\n")
 
-        for match in re.findall(pattern, buildlog):
-            SWORD_TRAIL.template[match[0]] = int(match[1][4:], 16)
-        
-        return True
-    except:
+def LoadRemixStuff(path="./output.log"):
+    try:
+        symbols = _LoadRemixSymbols(path)
+    except OSError:
         print("output.log not found")
-        return False
\ No newline at end of file
+        return False
+
+    for name, entries in symbols.items():
+        template = _REMIX_TEMPLATES[name].template
+        for label, value in entries:
+            template[label] = value
+    return True
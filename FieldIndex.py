@@ -0,0 +1,225 @@
+"""On-disk index of decoded command fields for querying a whole corpus.
+
+    python FieldIndex.py update DIR --db index.sqlite
+    python FieldIndex.py query --db index.sqlite --command HITBOX --where angle=361 --where "damage>15"
+    python FieldIndex.py query --db index.sqlite --where sfx=0x1F
+
+The index is a SQLite file with one row per command and one row per field
+value. Update() only re-parses files whose size or mtime changed and drops
+files that disappeared, so refreshing after an edit is cheap; queries run
+against the (name, value) index and never touch the moveset files.
+"""
+import argparse
+import os
+import re
+import sqlite3
+import sys
+from typing import NamedTuple
+
+import Command
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id       INTEGER PRIMARY KEY,
+    path     TEXT UNIQUE NOT NULL,
+    size     INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS commands (
+    id         INTEGER PRIMARY KEY,
+    file_id    INTEGER NOT NULL,
+    offset     INTEGER NOT NULL,
+    first_byte INTEGER NOT NULL,
+    command    TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS fields (
+    cmd_id INTEGER NOT NULL,
+    name   TEXT NOT NULL,
+    value  NUMERIC
+);
+CREATE INDEX IF NOT EXISTS commands_by_file ON commands (file_id);
+CREATE INDEX IF NOT EXISTS commands_by_class ON commands (command);
+CREATE INDEX IF NOT EXISTS fields_by_value ON fields (name, value, cmd_id);
+CREATE INDEX IF NOT EXISTS fields_by_command ON fields (cmd_id);
+"""
+
+_OPERATORS = {"=": "=", "==": "=", "!=": "!=", "<": "<", "<=": "<=", ">": ">", ">=": ">="}
+_CONDITION = re.compile(r"^\s*(\w+)\s*(==|!=|<=|>=|=|<|>)\s*(.+?)\s*$")
+
+
+class Hit(NamedTuple):
+    path: str
+    offset: int       # byte offset of the command in the file
+    command: str      # command class name
+    fields: dict      # every field value of the command
+
+
+def _field_types(command=None) -> dict:
+    """Field name → DataType class, for one command class or all of them."""
+    types = {}
+    for cls in Command.COMMANDS.values():
+        if command is None or cls.__name__ == command:
+            for f in cls.fields:
+                types.setdefault(f.name, f.dtype)
+    return types
+
+
+def ParseCondition(text, command=None) -> tuple:
+    """'damage>15', 'angle = 361' or 'effect=ELECTRIC' → (field, op, value).
+    Non-numeric values are looked up in the field's template."""
+    match = _CONDITION.match(text)
+    if not match:
+        raise ValueError(f"Expected 'field <op> value', got {text!r}")
+    name, op, raw = match.groups()
+    try:
+        value = int(raw, 0)
+    except ValueError:
+        try:
+            value = float(raw)
+        except ValueError:
+            dtype = _field_types(command).get(name)
+            template = dtype.template if dtype else None
+            if not template or raw not in template:
+                raise ValueError(f"{raw!r} is neither a number nor a label of {name}") from None
+            value = template[raw]
+    return name, _OPERATORS[op], value
+
+
+class FieldIndex:
+    def __init__(self, path):
+        self.db = sqlite3.connect(path)
+        self.db.executescript(_SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def Update(self, root, pattern=".bin") -> dict:
+        """Bring the index in line with every *.bin under `root`. Returns
+        counts of added, updated, removed and unchanged files."""
+        root = os.path.abspath(root)
+        stats = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+        prefix = os.path.join(root, "")
+        known = {path: (file_id, size, mtime)
+                 for file_id, path, size, mtime in self.db.execute(
+                     "SELECT id, path, size, mtime_ns FROM files WHERE substr(path, 1, ?) = ?",
+                     (len(prefix), prefix))}
+        seen = set()
+        with self.db:
+            for dirpath, _, filenames in os.walk(root):
+                for name in filenames:
+                    if not name.lower().endswith(pattern):
+                        continue
+                    path = os.path.join(dirpath, name)
+                    seen.add(path)
+                    st = os.stat(path)
+                    entry = known.get(path)
+                    if entry and entry[1:] == (st.st_size, st.st_mtime_ns):
+                        stats["unchanged"] += 1
+                        continue
+                    if entry:
+                        self._Forget(entry[0])
+                        self.db.execute("UPDATE files SET size = ?, mtime_ns = ? WHERE id = ?",
+                                        (st.st_size, st.st_mtime_ns, entry[0]))
+                        file_id = entry[0]
+                        stats["updated"] += 1
+                    else:
+                        file_id = self.db.execute("INSERT INTO files (path, size, mtime_ns) VALUES (?, ?, ?)",
+                                                  (path, st.st_size, st.st_mtime_ns)).lastrowid
+                        stats["added"] += 1
+                    self._Add(file_id, path)
+            for path, (file_id, _, _) in known.items():
+                if path not in seen:
+                    self._Forget(file_id)
+                    self.db.execute("DELETE FROM files WHERE id = ?", (file_id,))
+                    stats["removed"] += 1
+        return stats
+
+    def _Forget(self, file_id):
+        self.db.execute("DELETE FROM fields WHERE cmd_id IN "
+                        "(SELECT id FROM commands WHERE file_id = ?)", (file_id,))
+        self.db.execute("DELETE FROM commands WHERE file_id = ?", (file_id,))
+
+    def _Add(self, file_id, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        # Assign command ids up front so both tables go in with executemany.
+        next_id = self.db.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM commands").fetchone()[0]
+        commands, fields = [], []
+        offset = 0
+        for cmd_id, comm in enumerate(Command.ParseMoveset(data), next_id):
+            commands.append((cmd_id, file_id, offset, data[offset], type(comm).__name__))
+            fields.extend((cmd_id, name, value.value) for name, value in comm.GetFields())
+            offset += comm.command_size // 2
+        self.db.executemany("INSERT INTO commands (id, file_id, offset, first_byte, command) "
+                            "VALUES (?, ?, ?, ?, ?)", commands)
+        self.db.executemany("INSERT INTO fields (cmd_id, name, value) VALUES (?, ?, ?)", fields)
+
+    def Query(self, command=None, conditions=(), limit=None) -> list:
+        """Commands of class `command` (any class if None) whose fields meet
+        every (field, op, value) condition, as Hit tuples."""
+        sql = ["SELECT c.id, f.path, c.offset, c.command FROM commands c "
+               "JOIN files f ON f.id = c.file_id WHERE 1"]
+        params = []
+        if command is not None:
+            sql.append("AND c.command = ?")
+            params.append(command)
+        for name, op, value in conditions:
+            sql.append(f"AND c.id IN (SELECT cmd_id FROM fields WHERE name = ? AND value {_OPERATORS[op]} ?)")
+            params += [name, value]
+        sql.append("ORDER BY f.path, c.offset")
+        if limit is not None:
+            sql.append("LIMIT ?")
+            params.append(limit)
+        rows = self.db.execute(" ".join(sql), params).fetchall()
+
+        values = {}
+        ids = [row[0] for row in rows]
+        # SQLite caps the number of bound parameters, so fetch in slices.
+        for i in range(0, len(ids), 900):
+            chunk = ids[i:i+900]
+            for cmd_id, name, value in self.db.execute(
+                    f"SELECT cmd_id, name, value FROM fields WHERE cmd_id IN ({','.join('?' * len(chunk))})",
+                    chunk):
+                values.setdefault(cmd_id, {})[name] = value
+        return [Hit(path, offset, cls, values.get(cmd_id, {})) for cmd_id, path, offset, cls in rows]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and query an index of moveset command fields.")
+    # --db goes on each subcommand, after the action, as in the usage above.
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--db", default="moveset_index.sqlite", help="index file (default: %(default)s)")
+    sub = parser.add_subparsers(dest="action", required=True)
+    update = sub.add_parser("update", parents=[common], help="index new and changed files under a directory")
+    update.add_argument("root")
+    query = sub.add_parser("query", parents=[common], help="list commands matching field conditions")
+    query.add_argument("--command", help="command class, e.g. HITBOX")
+    query.add_argument("--where", action="append", default=[], metavar="COND",
+                       help="e.g. angle=361, 'damage>15', effect=ELECTRIC; may be repeated")
+    query.add_argument("--limit", type=int)
+    args = parser.parse_args(argv)
+
+    with FieldIndex(args.db) as index:
+        if args.action == "update":
+            stats = index.Update(args.root)
+            print(", ".join(f"{k} {v}" for k, v in stats.items()))
+            return 0
+        try:
+            conditions = [ParseCondition(c, args.command) for c in args.where]
+        except ValueError as e:
+            parser.error(str(e))
+        for hit in index.Query(args.command, conditions, args.limit):
+            shown = " ".join(f"{k}={v}" for k, v in hit.fields.items())
+            print(f"{hit.path}\t{hit.offset:#x}\t{hit.command}\t{shown}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
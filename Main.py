@@ -1,21 +1,32 @@
+import io
+import os
+import re
 import sys
+import threading
+import traceback
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QHBoxLayout, QVBoxLayout,
     QTextEdit, QTreeView, QPushButton, QMenu, QAbstractItemView,
     QItemDelegate, QComboBox, QSpinBox, QDoubleSpinBox,
-    QFileDialog, QMessageBox, QToolTip, QStyle, QFrame,
+    QFileDialog, QMessageBox, QToolTip, QStyle, QFrame, QDialog, QPlainTextEdit,
+    QProgressBar,
 )
 from PySide6.QtGui import (
-    QIcon, QAction, QStandardItem, QStandardItemModel,
+    QIcon, QAction, QUndoCommand, QUndoStack, QKeySequence,
     QFontDatabase, QTextCursor, QTextOption, QCursor, QBrush, QColor,
+    QTextCharFormat, QTextDocument, QTextDocumentFragment,
+)
+from PySide6.QtCore import (
+    Qt, Signal, QItemSelectionModel, QLocale, QEvent, QAbstractItemModel, QModelIndex,
+    QObject, QRunnable, QThreadPool,
 )
-from PySide6.QtCore import Qt, Signal, QItemSelectionModel, QLocale, QEvent
 
 QLocale.setDefault(QLocale(QLocale.C))
 
-from typing import List
+from typing import List, NamedTuple
 import Command
 import DataType
+import MovesetDiff
 
 
 # Each command type gets a stable color derived from its class name on first use.
@@ -30,9 +41,13 @@ _COLOR_PALETTE = [
     ("#3a3a5c", "#c8c8ff"),
 ]
 _type_color_cache: dict = {}
+# MovesetLoader's worker colours the hex document while the GUI thread
+# colours tree rows; slots are handed out under this lock.
+_type_color_lock = threading.Lock()
 
 SELECTED_BG = "#b84c00"
 SELECTED_FG = "#ffffff"
+HEX_BG = "#111827"
 
 # Short field names to show in tree parent row and tooltip header.
 SUMMARY_FIELDS = {
@@ -75,9 +90,14 @@ SUMMARY_FIELDS = {
 
 def get_command_color(cmd) -> tuple:
     key = type(cmd).__name__
-    if key not in _type_color_cache:
-        _type_color_cache[key] = _COLOR_PALETTE[len(_type_color_cache) % len(_COLOR_PALETTE)]
-    return _type_color_cache[key]
+    color = _type_color_cache.get(key)
+    if color is None:
+        with _type_color_lock:
+            color = _type_color_cache.get(key)
+            if color is None:
+                color = _COLOR_PALETTE[len(_type_color_cache) % len(_COLOR_PALETTE)]
+                _type_color_cache[key] = color
+    return color
 
 
 def get_command_summary(cmd) -> str:
@@ -91,8 +111,97 @@ def get_command_summary(cmd) -> str:
     return "  · " + "  ".join(parts) if parts else ""
 
 
+def get_command_label(cmd) -> str:
+    return f"{cmd._hex[0:2].upper()}  {cmd.command_name}{get_command_summary(cmd)}"
+
+
+def get_command_tooltip(cmd) -> str:
+    rows_html = ""
+    for k, v in cmd.GetFields():
+        label = v.GetLabel() if v.template else str(v.value)
+        rows_html += (
+            f"<tr>"
+            f"<td style='padding:2px 10px 2px 0;'><i>{k}</i></td>"
+            f"<td style='padding:2px 0;'><b>{label}</b></td>"
+            f"</tr>"
+        )
+    table = f"<table>{rows_html}</table>" if rows_html else ""
+    return (
+        f"<html>"
+        f"<b>{cmd.command_name}</b>"
+        f"&nbsp;&nbsp;<span style='color:#aaaaaa;font-size:10px;'>{cmd._hex[0:2].upper()}</span>"
+        f"<hr style='margin:4px 0;'>"
+        f"{table}"
+        f"</html>"
+    )
+
+
+def _hex_words(hex_text: str, space: str = '\u00a0') -> str:
+    return space.join(hex_text[j:j+8] for j in range(0, len(hex_text), 8))
+
+
+class HexDocumentBuilder:
+    """Builds the hex view's document, one text block per command, a chunk
+    of commands at a time. It only touches a detached QTextDocument, so
+    MovesetLoader runs it on its worker; the GIL is held per chunk rather
+    than for one parse of the whole script."""
+    CHUNK = 2048
+
+    def __init__(self):
+        self.document = QTextDocument()
+        self.colors = []               # (bg, fg) of each block
+        frame = self.document.rootFrame().frameFormat()
+        frame.setBackground(QColor(HEX_BG))
+        self.document.rootFrame().setFrameFormat(frame)
+        self._cursor = QTextCursor(self.document)
+
+    def Append(self, commands: list):
+        parts = []
+        # One encode and one hex conversion for the chunk; each command's
+        # text is then a slice of it.
+        script_hex = Command.EncodeMoveset(commands).hex().upper()
+        pos = 0
+        for comm in commands:
+            bg, fg = get_command_color(comm)
+            words = _hex_words(script_hex[pos:pos + comm.command_size], '&nbsp;')
+            pos += comm.command_size
+            parts.append(f'<p><a href="cmd" style="background-color:{bg};color:{fg};'
+                         f'text-decoration:none;">{words}</a></p>')
+        if not parts:
+            return
+        if self.colors:
+            self._cursor.insertBlock()
+        self._cursor.insertFragment(QTextDocumentFragment.fromHtml(''.join(parts)))
+        self.colors.extend(get_command_color(comm) for comm in commands)
+
+
+def BuildHexDocument(commands: list) -> tuple:
+    """(document, colours) for the hex view of `commands`."""
+    builder = HexDocumentBuilder()
+    for i in range(0, len(commands), builder.CHUNK):
+        builder.Append(commands[i:i + builder.CHUNK])
+    return builder.document, builder.colors
+
+
+_HEX_DIGIT = re.compile("[0-9A-Fa-f]")
+
+
 class HexTextEdit(QTextEdit):
+    """Hex panel. While focused it holds the raw hex for typing; otherwise
+    (display_mode) it shows each command as one coloured text block.
+
+    The display is built once by ShowCommands. Block n of the document is
+    command n, so selecting a command only restyles two blocks and an edit
+    only rewrites the blocks of the commands it touched; Qt re-lays out
+    just those lines.
+
+    Typed text is mirrored as it changes, and hex_edited reports each change
+    in hex digits: (first digit, digits removed, digits added), with -1
+    removed when the whole text was replaced. Finding the first digit only
+    counts the text between the change and the previous one, so typing costs
+    the same anywhere in a long script."""
     editingFinished = Signal()
+    hex_edited = Signal(int, int, str)
     command_hovered = Signal(int)
     command_clicked = Signal(int)
 
@@ -100,6 +209,17 @@ class HexTextEdit(QTextEdit):
         super().__init__(parent)
         self.display_mode = False
         self._last_hover_idx = -1
+        self._colors: list = []        # (bg, fg) of each command's block
+        self._selected = -1
+        self._formats: dict = {}       # (bg, fg) -> QTextCharFormat
+        self._typed = ""               # plain text outside display_mode; None if unknown
+        self._hex = ""                 # its hex digits, upper-cased
+        self._mark = (0, 0)            # (position in _typed, hex digits before it)
+        self._edits = []               # hex_edited arguments held until textChanged
+        self.document().contentsChange.connect(self._on_contents_change)
+        # Emitted once the document is done changing, as a receiver may
+        # replace it.
+        self.textChanged.connect(self._emit_edits)
         self.viewport().setMouseTracking(True)
         self.viewport().installEventFilter(self)
 
@@ -107,28 +227,30 @@ class HexTextEdit(QTextEdit):
         if obj is self.viewport() and self.display_mode:
             t = event.type()
             if t == QEvent.Type.MouseMove:
-                anchor = self.anchorAt(event.position().toPoint())
-                idx = int(anchor[4:]) if anchor.startswith("cmd:") else -1
+                idx = self.CommandAt(event.position().toPoint())
                 if idx != self._last_hover_idx:
                     self._last_hover_idx = idx
                     self.command_hovered.emit(idx)
             elif t == QEvent.Type.MouseButtonPress and event.button() == Qt.LeftButton:
-                anchor = self.anchorAt(event.position().toPoint())
-                if anchor.startswith("cmd:"):
-                    try:
-                        self.command_clicked.emit(int(anchor[4:]))
-                    except ValueError:
-                        pass
+                idx = self.CommandAt(event.position().toPoint())
+                if idx >= 0:
+                    self.command_clicked.emit(idx)
         return super().eventFilter(obj, event)
 
     def focusInEvent(self, event):
         super().focusInEvent(event)
-        self.display_mode = False
-        raw = ''.join(c for c in self.toPlainText() if c in '0123456789abcdefABCDEF').upper()
-        # Show with a space every 8 chars for readability; _get_raw_hex strips them back out
-        spaced = ' '.join(raw[i:i+8] for i in range(0, len(raw), 8))
+        if self.display_mode:
+            # Keep a line per command: a keystroke then re-lays out one
+            # short line rather than the whole script.
+            self.display_mode = False
+            spaced = self.toPlainText()
+        else:
+            raw = ''.join(c for c in self.toPlainText() if c in '0123456789abcdefABCDEF').upper()
+            # Show with a space every 8 chars for readability; HexDigits strips them back out
+            spaced = ' '.join(raw[i:i+8] for i in range(0, len(raw), 8))
         self.blockSignals(True)
         self.setPlainText(spaced)
+        self.document().setUndoRedoEnabled(True)
         self.blockSignals(False)
         cursor = self.textCursor()
         cursor.movePosition(QTextCursor.MoveOperation.End)
@@ -138,6 +260,168 @@ class HexTextEdit(QTextEdit):
         super().focusOutEvent(event)
         self.editingFinished.emit()
 
+    # ── Typed hex ─────────────────────────────────────────────────────
+
+    def HexDigits(self) -> str:
+        """The hex digits of the text, upper-cased."""
+        if self._typed is None:
+            return ''.join(_HEX_DIGIT.findall(self.toPlainText())).upper()
+        return self._hex
+
+    def _digits_before(self, pos: int) -> int:
+        mark, digits = self._mark
+        if pos >= mark:
+            return digits + len(_HEX_DIGIT.findall(self._typed, mark, pos))
+        return digits - len(_HEX_DIGIT.findall(self._typed, pos, mark))
+
+    def _on_contents_change(self, pos: int, removed: int, added: int):
+        if not self.signalsBlocked():
+            # Display updates block signals, so this is typed or loaded hex.
+            self.display_mode = False
+        elif self.display_mode:
+            return
+        doc = self.document()
+        size = doc.characterCount() - 1  # without the final paragraph mark
+        # Qt may count that mark in a change spanning the whole document.
+        end = min(pos + added, size)
+        if self._typed is not None:
+            removed = min(removed, len(self._typed) - pos)
+        if self._typed is None or len(self._typed) - removed + end - pos != size:
+            # Out of step (text swapped while in display_mode): start over.
+            self._typed = self.toPlainText()
+            self._hex = ''.join(_HEX_DIGIT.findall(self._typed)).upper()
+            self._mark = (0, 0)
+            self._edits = [] if self.signalsBlocked() else [(0, -1, self._hex)]
+            return
+        cursor = QTextCursor(doc)
+        cursor.setPosition(pos)
+        cursor.setPosition(end, QTextCursor.MoveMode.KeepAnchor)
+        text = cursor.selectedText()
+        digit = self._digits_before(pos)
+        gone = len(_HEX_DIGIT.findall(self._typed, pos, pos + removed))
+        new = ''.join(_HEX_DIGIT.findall(text)).upper()
+        self._typed = self._typed[:pos] + text + self._typed[pos + removed:]
+        self._hex = self._hex[:digit] + new + self._hex[digit + gone:]
+        self._mark = (end, digit + len(new))
+        if not self.signalsBlocked():
+            self._edits.append((digit, gone, new))
+
+    def _emit_edits(self):
+        edits, self._edits = self._edits, []
+        for edit in edits:
+            self.hex_edited.emit(*edit)
+
+    # ── Command display ───────────────────────────────────────────────
+
+    def CommandAt(self, point) -> int:
+        """Index of the command under a viewport point, or -1."""
+        if not self.anchorAt(point):
+            return -1
+        return self.cursorForPosition(point).blockNumber()
+
+    def _format(self, colors: tuple) -> QTextCharFormat:
+        fmt = self._formats.get(colors)
+        if fmt is None:
+            bg, fg = colors
+            fmt = QTextCharFormat()
+            fmt.setAnchor(True)
+            fmt.setAnchorHref("cmd")
+            fmt.setBackground(QColor(bg))
+            fmt.setForeground(QColor(fg))
+            self._formats[colors] = fmt
+        return fmt
+
+    def ShowCommands(self, commands: list, selected: int = -1):
+        """Rebuild the whole display."""
+        self.ShowDocument(*BuildHexDocument(commands), selected=selected)
+
+    def ShowDocument(self, doc: QTextDocument, colors: list, selected: int = -1):
+        """Display a document made by BuildHexDocument, which may have been
+        built on another thread and moved to this one."""
+        old = self.document()
+        doc.setDefaultFont(old.defaultFont())
+        doc.setDefaultTextOption(old.defaultTextOption())
+        # Restyling and patching blocks must not land on the undo stack.
+        doc.setUndoRedoEnabled(False)
+        # Owned by the editor, so the next setDocument deletes it.
+        doc.setParent(self)
+        self.display_mode = True
+        self._typed = None
+        self.blockSignals(True)
+        self.setDocument(doc)
+        self.blockSignals(False)
+        doc.contentsChange.connect(self._on_contents_change)
+        self._colors, self._selected = colors, -1
+        self.SetSelected(selected)
+
+    def SetSelected(self, idx: int):
+        """Highlight command `idx` (-1 for none) and unhighlight the last one."""
+        if not self.display_mode:
+            return
+        old, self._selected = self._selected, idx if 0 <= idx < len(self._colors) else -1
+        self.blockSignals(True)
+        if 0 <= old < len(self._colors) and old != self._selected:
+            self._restyle(old, self._colors[old])
+        if self._selected >= 0:
+            self._restyle(self._selected, (SELECTED_BG, SELECTED_FG))
+        self.blockSignals(False)
+
+    def _restyle(self, idx: int, colors: tuple):
+        block = self.document().findBlockByNumber(idx)
+        cursor = QTextCursor(block)
+        cursor.setPosition(block.position() + block.length() - 1, QTextCursor.MoveMode.KeepAnchor)
+        cursor.mergeCharFormat(self._format(colors))
+
+    def ReplaceCommands(self, start: int, removed: int, new: list):
+        """Swap the blocks of `removed` commands at `start` for blocks of
+        `new` ones. The affected commands lose the selection highlight."""
+        if not self.display_mode:
+            return
+        doc = self.document()
+        n = len(self._colors)
+        self.blockSignals(True)
+        cursor = QTextCursor(doc)
+        cursor.beginEditBlock()
+        if removed:
+            # Take a neighbouring block boundary along so no empty line is
+            # left behind.
+            if start + removed < n:
+                cursor.setPosition(doc.findBlockByNumber(start).position())
+                cursor.setPosition(doc.findBlockByNumber(start + removed).position(),
+                                   QTextCursor.MoveMode.KeepAnchor)
+            else:
+                if start:
+                    prev = doc.findBlockByNumber(start - 1)
+                    cursor.setPosition(prev.position() + prev.length() - 1)
+                cursor.movePosition(QTextCursor.MoveOperation.End, QTextCursor.MoveMode.KeepAnchor)
+            cursor.removeSelectedText()
+        remaining = n - removed
+        colors = []
+        for i, comm in enumerate(new):
+            colors.append(get_command_color(comm))
+            text = _hex_words(comm.ToHex())
+            if start < remaining:
+                # Before an existing block: the text, then a break.
+                if i == 0:
+                    cursor.setPosition(doc.findBlockByNumber(start).position())
+                cursor.insertText(text, self._format(colors[-1]))
+                cursor.insertBlock()
+            else:
+                # At the end: a break after the last block, then the text.
+                if i == 0:
+                    cursor.movePosition(QTextCursor.MoveOperation.End)
+                if remaining or i:
+                    cursor.insertBlock()
+                cursor.insertText(text, self._format(colors[-1]))
+        cursor.endEditBlock()
+        self.blockSignals(False)
+
+        self._colors[start:start + removed] = colors
+        if self._selected >= start + removed:
+            self._selected += len(new) - removed
+        elif self._selected >= start:
+            self._selected = -1
+
 
 def _parse_number(text: str):
     """Parse a user-typed number: decimal, 0x hex, or bare hex (e.g. '1A').
@@ -153,10 +437,19 @@ def _parse_number(text: str):
         return None
 
 
+def _field_text(attr: DataType.BASE_TYPE) -> str:
+    return attr.GetLabel() if attr.template is not None else str(attr.value)
+
+
 class CustomDelegate(QItemDelegate):
+    def __init__(self, parent=None, field_edited=None):
+        super().__init__(parent)
+        # Called as field_edited(index, value) instead of writing the value
+        # directly, so the viewer can record the edit for undo.
+        self.field_edited = field_edited
+
     def createEditor(self, parent, option, index):
-        item = index.model().itemFromIndex(index)
-        attr: DataType.BASE_TYPE = item.data(Qt.UserRole)
+        attr: DataType.BASE_TYPE = index.data(Qt.UserRole)
 
         if attr and attr.template is not None:
             editor = QComboBox(parent)
@@ -173,54 +466,436 @@ class CustomDelegate(QItemDelegate):
         return editor
 
     def setEditorData(self, editor, index):
-        item = index.model().itemFromIndex(index)
+        text = index.data()
         if isinstance(editor, QSpinBox):
             try:
-                editor.setValue(int(item.text()))
+                editor.setValue(int(text))
             except ValueError:
                 pass
         elif isinstance(editor, QDoubleSpinBox):
             try:
-                editor.setValue(float(item.text()))
+                editor.setValue(float(text))
             except ValueError:
                 pass
         elif isinstance(editor, QComboBox):
-            editor.setCurrentText(item.text())
+            editor.setCurrentText(text)
         else:
             super().setEditorData(editor, index)
 
     def setModelData(self, editor, model, index):
-        item = index.model().itemFromIndex(index)
-        attr = item.data(Qt.UserRole)
+        attr = index.data(Qt.UserRole)
         if attr is None:
             return
 
-        if isinstance(editor, QSpinBox):
-            attr.SetValue(editor.value())
-            item.setText(str(editor.value()))
-        elif isinstance(editor, QDoubleSpinBox):
-            attr.SetValue(editor.value())
-            item.setText(str(editor.value()))
+        if isinstance(editor, (QSpinBox, QDoubleSpinBox)):
+            value = editor.value()
         elif isinstance(editor, QComboBox):
             text = editor.currentText().strip()
-            label_val = attr.GetLabelValue(text)
-            if label_val is not None:
-                attr.SetValue(label_val)
-                item.setText(text)
-            else:
-                val = _parse_number(text)
-                if val is not None:
-                    attr.SetValue(val)
-                    item.setText(attr.GetLabel())
+            value = attr.GetLabelValue(text)
+            if value is None:
+                value = _parse_number(text)
+            if value is None:
+                return
         else:
             super().setModelData(editor, model, index)
+            return
+
+        if self.field_edited is not None:
+            self.field_edited(index, value)
+        else:
+            model.setData(index, value)
+
+
+# ── Undoable edits ────────────────────────────────────────────────────────────
+# Each delta touches only the rows it concerns, through the viewer's
+# _insert_commands / _remove_commands / _move_command / _set_field helpers.
+
+class InsertCommandDelta(QUndoCommand):
+    def __init__(self, viewer, row, comm):
+        super().__init__(f"Add {comm.command_name}")
+        self.viewer, self.row, self.comm = viewer, row, comm
+
+    def redo(self):
+        self.viewer._insert_commands(self.row, [self.comm])
+
+    def undo(self):
+        self.viewer._remove_commands(self.row, 1)
+
+
+class RemoveCommandDelta(QUndoCommand):
+    def __init__(self, viewer, row):
+        super().__init__(f"Delete {viewer.commands[row].command_name}")
+        self.viewer, self.row, self.removed = viewer, row, []
+
+    def redo(self):
+        self.removed = self.viewer._remove_commands(self.row, 1)
 
+    def undo(self):
+        self.viewer._insert_commands(self.row, self.removed)
 
-class CustomStandardItem(QStandardItem):
-    def __init__(self, text, delegate_type=None):
-        super().__init__(text)
-        if delegate_type:
-            self.setData(delegate_type, Qt.UserRole)
+
+class MoveCommandDelta(QUndoCommand):
+    def __init__(self, viewer, src, dst):
+        super().__init__(f"Move {viewer.commands[src].command_name}")
+        self.viewer, self.src, self.dst = viewer, src, dst
+
+    def redo(self):
+        self.viewer._move_command(self.src, self.dst)
+
+    def undo(self):
+        self.viewer._move_command(self.dst, self.src)
+
+
+class SetFieldDelta(QUndoCommand):
+    def __init__(self, viewer, row, name, old, new):
+        super().__init__(f"Set {name}")
+        self.viewer, self.row, self.name, self.old, self.new = viewer, row, name, old, new
+
+    def redo(self):
+        self.viewer._set_field(self.row, self.name, self.new)
+
+    def undo(self):
+        self.viewer._set_field(self.row, self.name, self.old)
+
+
+# ── Tree model ────────────────────────────────────────────────────────────────
+
+class CommandTreeModel(QAbstractItemModel):
+    """Two-column tree over a command list: one top-level row per command,
+    one child row per field. Nothing is materialised per row; labels and
+    values are read from the commands when the view asks for them.
+
+    Top-level indexes carry internalId 0. A field row carries a key naming
+    its command, so it stays attached to the right command when rows above
+    it are inserted or removed; keys are only handed out for commands whose
+    fields have been shown. Each key records its command's row, shifted in
+    the same step as every edit to the list, so parent() is a lookup even
+    while Qt walks an expanded tree's children during an insert or remove.
+
+    A command's label and tooltip are rendered on first use and kept until
+    one of its fields changes (FieldChanged), so repainting or hovering over
+    unchanged commands does no formatting."""
+    HEADERS = ("Command", "Value")
+
+    def __init__(self, commands=None, parent=None):
+        super().__init__(parent)
+        self.commands = [] if commands is None else commands
+        self._key_of = {}     # id(command) -> key
+        self._by_key = {}     # key -> [command, row]
+        self._next_key = 1
+        self._text = {}       # id(command) -> [command, label, tooltip]
+
+    # Keys
+
+    def _key(self, row: int) -> int:
+        comm = self.commands[row]
+        key = self._key_of.get(id(comm))
+        if key is None:
+            key = self._key_of[id(comm)] = self._next_key
+            self._by_key[key] = [comm, row]
+            self._next_key += 1
+        return key
+
+    def _row_of(self, key: int) -> int:
+        entry = self._by_key.get(key)
+        return -1 if entry is None else entry[1]
+
+    def _shift_rows(self, start: int, end: int, delta: int):
+        """Move the recorded row of every keyed command in [start, end)."""
+        for entry in self._by_key.values():
+            if start <= entry[1] < end:
+                entry[1] += delta
+
+    def _forget(self, comms):
+        for comm in comms:
+            self._text.pop(id(comm), None)
+            key = self._key_of.pop(id(comm), None)
+            if key is not None:
+                del self._by_key[key]
+
+    # Rendered text
+
+    def _text_entry(self, row: int) -> list:
+        comm = self.commands[row]
+        entry = self._text.get(id(comm))
+        if entry is None or entry[0] is not comm:
+            entry = self._text[id(comm)] = [comm, None, None]
+        return entry
+
+    def Label(self, row: int) -> str:
+        """Top-level row text: opcode, command name and summary fields."""
+        entry = self._text_entry(row)
+        if entry[1] is None:
+            entry[1] = get_command_label(entry[0])
+        return entry[1]
+
+    def Tooltip(self, row: int) -> str:
+        entry = self._text_entry(row)
+        if entry[2] is None:
+            entry[2] = get_command_tooltip(entry[0])
+        return entry[2]
+
+    def ClearTextCache(self):
+        """Drop every rendered label and tooltip, e.g. after templates gained
+        labels, and have views repaint the command rows."""
+        self._text.clear()
+        if self.commands:
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self.commands) - 1, 0))
+
+    # Read access
+
+    def index(self, row, column, parent=QModelIndex()):
+        # Called for every visible row each time the view lays out, which an
+        # expanded tree does after every insert or remove: keep it lean.
+        if column not in (0, 1) or row < 0:
+            return QModelIndex()
+        if not parent.isValid():
+            if row < len(self.commands):
+                return self.createIndex(row, column, 0)
+            return QModelIndex()
+        if parent.internalId():
+            return QModelIndex()
+        parent_row = parent.row()
+        comm = self.commands[parent_row]
+        if row >= len(type(comm).fields):
+            return QModelIndex()
+        key = self._key_of.get(id(comm)) or self._key(parent_row)
+        return self.createIndex(row, column, key)
+
+    def parent(self, index=QModelIndex()):
+        if not index.isValid() or index.internalId() == 0:
+            return QModelIndex()
+        row = self._row_of(index.internalId())
+        return self.createIndex(row, 0, 0) if row >= 0 else QModelIndex()
+
+    def rowCount(self, parent=QModelIndex()):
+        if not parent.isValid():
+            return len(self.commands)
+        if parent.internalId() == 0 and parent.column() == 0:
+            return len(type(self.commands[parent.row()]).fields)
+        return 0
+
+    def columnCount(self, parent=QModelIndex()):
+        return 2
+
+    def hasChildren(self, parent=QModelIndex()):
+        # Asked for every row whenever the view lays out; one call instead
+        # of the default rowCount + columnCount pair.
+        if not parent.isValid():
+            return bool(self.commands)
+        return (parent.internalId() == 0 and parent.column() == 0
+                and bool(type(self.commands[parent.row()]).fields))
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    # Field rows never have children; saying so spares the view a
+    # hasChildren call per field row on every layout.
+    _NO_FLAGS = Qt.ItemFlag.NoItemFlags
+    _COMMAND_FLAGS = Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+    _NAME_FLAGS = Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemNeverHasChildren
+    _VALUE_FLAGS = (Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsEditable | Qt.ItemFlag.ItemIsSelectable
+                    | Qt.ItemFlag.ItemNeverHasChildren)
+
+    def flags(self, index):
+        if index.internalId() == 0:
+            return self._COMMAND_FLAGS if index.isValid() else self._NO_FLAGS
+        return self._VALUE_FLAGS if index.column() else self._NAME_FLAGS
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if index.internalId() == 0:
+            comm = self.commands[index.row()]
+            if role == Qt.ItemDataRole.DisplayRole:
+                return self.Label(index.row()) if index.column() == 0 else None
+            if role == Qt.ItemDataRole.BackgroundRole:
+                return QBrush(QColor(get_command_color(comm)[0]))
+            if role == Qt.ItemDataRole.ForegroundRole:
+                return QBrush(QColor(get_command_color(comm)[1]))
+            if role == Qt.ItemDataRole.UserRole:
+                return comm
+            return None
+
+        row = self._row_of(index.internalId())
+        if row < 0:
+            return None
+        name, attr = self.commands[row].GetFields()[index.row()]
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            return name if index.column() == 0 else _field_text(attr)
+        if role == Qt.ItemDataRole.UserRole and index.column() == 1:
+            return attr
+        return None
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        attr = index.data(Qt.ItemDataRole.UserRole)
+        if role != Qt.ItemDataRole.EditRole or not isinstance(attr, DataType.BASE_TYPE):
+            return False
+        attr.SetValue(value)
+        self.FieldChanged(index.parent().row(), index.row())
+        return True
+
+    # Edits, each announced with the narrowest signal that covers it
+
+    def FieldChanged(self, row: int, field_row: int):
+        self._text.pop(id(self.commands[row]), None)
+        child = self.index(field_row, 1, self.index(row, 0))
+        self.dataChanged.emit(child, child)
+        top = self.index(row, 0)
+        self.dataChanged.emit(top, top)
+
+    def InsertCommands(self, row: int, comms: list):
+        if not comms:
+            return
+        self.beginInsertRows(QModelIndex(), row, row + len(comms) - 1)
+        self._shift_rows(row, len(self.commands), len(comms))
+        self.commands[row:row] = comms
+        self.endInsertRows()
+
+    def RemoveCommands(self, row: int, count: int) -> list:
+        if count <= 0:
+            return []
+        self.beginRemoveRows(QModelIndex(), row, row + count - 1)
+        removed = self.commands[row:row + count]
+        del self.commands[row:row + count]
+        self._forget(removed)
+        self._shift_rows(row + count, len(self.commands) + count, -count)
+        self.endRemoveRows()
+        return removed
+
+    def MoveCommand(self, src: int, dst: int):
+        # Qt wants the destination as the row the item lands before.
+        if not self.beginMoveRows(QModelIndex(), src, src, QModelIndex(), dst + 1 if dst > src else dst):
+            return
+        key = self._key_of.get(id(self.commands[src]))
+        if dst > src:
+            self._shift_rows(src + 1, dst + 1, -1)
+        else:
+            self._shift_rows(dst, src, 1)
+        if key is not None:
+            self._by_key[key][1] = dst
+        self.commands.insert(dst, self.commands.pop(src))
+        self.endMoveRows()
+
+    def ReplaceCommands(self, start: int, removed: int, new: list) -> bool:
+        """Swap `removed` commands at `start` for `new` ones. When each new
+        command has the class of the one it replaces, the rows stay (and so
+        do expanded ones), only their data is announced as changed, and True
+        is returned."""
+        old = self.commands[start:start + removed]
+        if len(old) != len(new) or any(type(a) is not type(b) for a, b in zip(old, new)):
+            self.RemoveCommands(start, removed)
+            self.InsertCommands(start, new)
+            return False
+        for row, (was, comm) in enumerate(zip(old, new), start):
+            self._text.pop(id(was), None)
+            self.commands[row] = comm
+            key = self._key_of.pop(id(was), None)
+            if key is not None:
+                # Field rows already shown now read the new command's fields.
+                self._key_of[id(comm)] = key
+                self._by_key[key][0] = comm
+                parent = self.index(row, 0)
+                self.dataChanged.emit(self.index(0, 0, parent),
+                                      self.index(len(type(comm).fields) - 1, 1, parent))
+        if new:
+            self.dataChanged.emit(self.index(start, 0), self.index(start + len(new) - 1, 1))
+        return True
+
+    def SetCommands(self, commands: list):
+        self.beginResetModel()
+        self.commands = commands
+        self._key_of.clear()
+        self._by_key.clear()
+        self._text.clear()
+        self.endResetModel()
+
+
+# ── Background loading ────────────────────────────────────────────────────────
+
+class LoaderSignals(QObject):
+    # Emitted from the worker thread; Qt queues them to the GUI thread.
+    batch = Signal(object)            # list of decoded commands, in file order
+    progress = Signal(int, int)       # bytes decoded, file size
+    finished = Signal(object)         # LoadResult
+    failed = Signal(str)
+
+
+class LoadResult(NamedTuple):
+    data: bytes
+    offsets: list        # byte offset of every command
+    document: object     # hex view QTextDocument, see BuildHexDocument
+    colors: list
+
+
+class MovesetLoader(QRunnable):
+    """Reads and decodes a moveset file on a QThreadPool thread, handing
+    decoded commands to the GUI in batches as it goes, then builds the hex
+    view's document there too. Cancel() makes the worker stop at the next
+    batch boundary without emitting anything more.
+
+    Every batch makes the tree lay out all of its rows again, so batches
+    double in size: the first rows show up at once and the layouts still
+    add up to a small multiple of one. The worker waits for BatchTaken()
+    after each batch: the layout calls back into the Python model for every
+    row, and each of those calls would otherwise queue for the GIL behind
+    the decoding."""
+    FIRST_BATCH = 1024
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self.signals = LoaderSignals()
+        self._cancelled = False
+        self._taken = threading.Event()
+
+    def Cancel(self):
+        self._cancelled = True
+        self._taken.set()
+
+    def BatchTaken(self):
+        """Called by the receiver once it is done with the last batch."""
+        self._taken.set()
+
+    def _hand_over(self, batch: list) -> bool:
+        self._taken.clear()
+        if self._cancelled:            # checked after clear(): a Cancel() may have set it
+            return False
+        self.signals.batch.emit(batch)
+        self._taken.wait()
+        return not self._cancelled
+
+    def run(self):
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except OSError as e:
+            if not self._cancelled:
+                self.signals.failed.emit(f"Could not read file: {e}")
+            return
+        commands, offsets = [], []
+        sent, batch_size = 0, self.FIRST_BATCH
+        for offset, comm in Command.IterMoveset(io.BytesIO(data)):
+            offsets.append(offset)
+            commands.append(comm)
+            if len(commands) - sent == batch_size:
+                self.signals.progress.emit(offset, len(data))
+                if not self._hand_over(commands[sent:]):
+                    return
+                sent, batch_size = len(commands), batch_size * 2
+        self.signals.progress.emit(len(data), len(data))
+        if sent < len(commands) and not self._hand_over(commands[sent:]):
+            return
+
+        builder = HexDocumentBuilder()
+        for i in range(0, len(commands), builder.CHUNK):
+            if self._cancelled:
+                return
+            builder.Append(commands[i:i + builder.CHUNK])
+        builder.document.moveToThread(QApplication.instance().thread())
+        self.signals.finished.emit(LoadResult(data, offsets, builder.document, builder.colors))
 
 
 def _sidebar_button(text: str, tooltip: str, sp: "QStyle.StandardPixmap | None" = None) -> QPushButton:
@@ -237,10 +912,27 @@ def _sidebar_button(text: str, tooltip: str, sp: "QStyle.StandardPixmap | None"
 class BinaryFileViewer(QMainWindow):
     def __init__(self):
         super().__init__()
-        self.commands: List[Command.BaseCommand] = []
+        self.tree_model = CommandTreeModel(parent=self)
+        self._offsets: List[int] = []  # byte offset of each command in self._data
+        self._data = b""               # bytes self.commands were last parsed from
+        self._data_stale = False       # tree edits since _data/_offsets were derived
+        self._hex_span = None          # typed hex not reparsed yet, see update_decoded_data
+        self._column_stale = False     # rows typed in since column 0 was last fitted
+        self.undo_stack = QUndoStack(self)
         self._updating = False
+        self._loader = None            # MovesetLoader of the file being opened
+        self._before_load = None       # (commands, data, offsets) to restore on cancel
         self.initUI()
 
+    @property
+    def commands(self) -> List[Command.BaseCommand]:
+        """The command list shown in the tree; tree_model owns it."""
+        return self.tree_model.commands
+
+    @commands.setter
+    def commands(self, commands: List[Command.BaseCommand]):
+        self.tree_model.SetCommands(commands)
+
     def initUI(self):
         self.setGeometry(100, 100, 1200, 720)
         self.setWindowTitle("SSB64 Moveset Editor")
@@ -281,13 +973,14 @@ class BinaryFileViewer(QMainWindow):
         tree_layout.addWidget(tree_buttons)
 
         self.tree = QTreeView(self)
-        self.tree.setModel(QStandardItemModel())
+        self.tree.setModel(self.tree_model)
         self.tree.setAlternatingRowColors(False)
         self.tree.setHeaderHidden(False)
         self.tree.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
-        self.delegate = CustomDelegate()
+        self.delegate = CustomDelegate(field_edited=self._on_field_edited)
         self.tree.setItemDelegate(self.delegate)
-        self.tree.setUniformRowHeights(False)
+        self.tree.setUniformRowHeights(True)
+        self._edit_triggers = self.tree.editTriggers()
         tree_layout.addWidget(self.tree)
         layout.addWidget(tree_col)
 
@@ -333,10 +1026,33 @@ class BinaryFileViewer(QMainWindow):
         save_action = QAction("Save", self)
         save_action.triggered.connect(self.save_file)
         file_menu.addAction(save_action)
+        compare_action = QAction("Compare With File...", self)
+        compare_action.triggered.connect(self.compare_with_file)
+        file_menu.addAction(compare_action)
+        edit_menu = menubar.addMenu("Edit")
+        self.undo_action = self.undo_stack.createUndoAction(self, "Undo")
+        self.undo_action.setShortcut(QKeySequence.StandardKey.Undo)
+        self.redo_action = self.undo_stack.createRedoAction(self, "Redo")
+        self.redo_action.setShortcut(QKeySequence.StandardKey.Redo)
+        edit_menu.addAction(self.undo_action)
+        edit_menu.addAction(self.redo_action)
+        # Everything that edits or reads the whole script; off while loading.
+        self._edit_controls = [self.toolcol, save_action, compare_action,
+                               self.undo_action, self.redo_action]
+
+        # ── Load progress ────────────────────────────────────────────
+        self.load_progress = QProgressBar()
+        self.load_progress.setMaximumWidth(240)
+        self.load_cancel = QPushButton("Cancel")
+        self.load_cancel.clicked.connect(self.cancel_load)
+        self.statusBar().addPermanentWidget(self.load_progress)
+        self.statusBar().addPermanentWidget(self.load_cancel)
+        self.load_progress.hide()
+        self.load_cancel.hide()
 
         # ── Signal wiring ────────────────────────────────────────────
-        self.binary_text.textChanged.connect(self.update_decoded_data)
-        self.binary_text.editingFinished.connect(lambda: self._refresh_hex_display())
+        self.binary_text.hex_edited.connect(self.update_decoded_data)
+        self.binary_text.editingFinished.connect(self._finish_hex_edit)
         self.binary_text.command_hovered.connect(self.show_command_tooltip)
         self.binary_text.command_clicked.connect(self.on_hex_command_clicked)
         self.tree.model().dataChanged.connect(self.on_tree_data_changed)
@@ -350,116 +1066,190 @@ class BinaryFileViewer(QMainWindow):
 
     # ── Helpers ───────────────────────────────────────────────────────
 
-    def _get_raw_hex(self) -> str:
-        return ''.join(c for c in self.binary_text.toPlainText()
-                       if c in '0123456789abcdefABCDEF').upper()
-
-    def _build_hex_html(self, selected_idx: int = -1) -> str:
-        parts = []
-        for i, cmd in enumerate(self.commands):
-            if i == selected_idx:
-                bg, fg = SELECTED_BG, SELECTED_FG
-            else:
-                bg, fg = get_command_color(cmd)
-            hex_str = cmd.ToHex().upper()
-            words = [hex_str[j:j+8] for j in range(0, len(hex_str), 8)]
-            inner = '&nbsp;'.join(words)
-            parts.append(
-                f'<a href="cmd:{i}" style="color:{fg};text-decoration:none;">'
-                f'<span style="background-color:{bg};color:{fg};'
-                f'padding:1px 4px;border-radius:2px;">{inner}</span>'
-                f'</a>'
-            )
-        body = '&nbsp; '.join(parts)
-        return (
-            '<html><body style="background-color:#111827;margin:4px;">'
-            '<p style="font-family:monospace;font-size:10pt;line-height:2em;">'
-            f'{body}</p></body></html>'
-        )
-
     def _refresh_hex_display(self, selected_idx: int = -1):
         if not self.commands:
             return
-        html = self._build_hex_html(selected_idx)
-        self.binary_text.display_mode = True
-        self.binary_text.blockSignals(True)
-        self.binary_text.setHtml(html)
-        self.binary_text.blockSignals(False)
+        self.binary_text.ShowCommands(self.commands, selected_idx)
 
-    def _build_tree_item(self, comm: Command.BaseCommand) -> QStandardItem:
-        bg, fg = get_command_color(comm)
-        summary = get_command_summary(comm)
-        label = f"{comm._hex[0:2].upper()}  {comm.command_name}{summary}"
-        parent = QStandardItem(label)
-        parent.setFlags(Qt.ItemFlag.NoItemFlags | Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable)
-        parent.setBackground(QBrush(QColor(bg)))
-        parent.setForeground(QBrush(QColor(fg)))
-        parent.setData(comm)
-
-        for k, v in comm.__dict__.items():
-            if k.startswith('_'):
-                continue
-            if isinstance(v, DataType.BASE_TYPE):
-                child0 = QStandardItem(k)
-                child0.setFlags(Qt.ItemFlag.NoItemFlags | Qt.ItemFlag.ItemIsEnabled)
-                child1 = CustomStandardItem(str(v.value))
-                child1.setFlags(
-                    Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsEditable | Qt.ItemFlag.ItemIsSelectable)
-                child1.setData(v, Qt.ItemDataRole.UserRole)
-                if v.template is not None:
-                    child1.setText(v.GetLabel())
-                parent.appendRow([child0, child1])
-
-        return parent
+    def _select_in_hex(self, row: int):
+        """Highlight `row` in the hex view, restyling only the blocks whose
+        highlight changes when the command display is already up."""
+        if self._loader is not None:
+            return
+        if self.binary_text.display_mode:
+            self.binary_text.SetSelected(row)
+        else:
+            self._refresh_hex_display(selected_idx=row)
 
     # ── Data flow ─────────────────────────────────────────────────────
 
-    def update_decoded_data(self):
+    def update_decoded_data(self, digit: int, removed: int, added: str):
+        """Fold a hex edit (see HexTextEdit.hex_edited) into the span of
+        digits typed over, and reparse the span once it covers whole bytes.
+
+        The span is [first, end, old end]: digits [first, end) of the text
+        replaced digits [first, old end) of the one self._data was read
+        from. An odd difference means a lone digit went in or out, which
+        would move every later byte by half; that waits for the next digit
+        rather than re-decoding the rest of the script each keystroke."""
         if self._updating:
             return
+        if self._data_stale:
+            # The tree was edited since the text was shown: diff all of it.
+            self._sync_data_from_commands()
+            removed, added = -1, self.binary_text.HexDigits()
+        if removed < 0:
+            self._hex_span = [0, len(added), 2 * len(self._data)]
+        elif self._hex_span is None:
+            # The text shows no bytes past the last command.
+            before = len(self.binary_text.HexDigits()) - len(added) + removed
+            self._data = self._data[:before // 2]
+            self._hex_span = [digit, digit + len(added), digit + removed]
+        else:
+            span = self._hex_span
+            end = digit + removed
+            if end > span[1]:
+                span[2] += end - span[1]
+                span[1] = end
+            span[0] = min(span[0], digit)
+            span[1] += len(added) - removed
+        focused = self.binary_text.hasFocus()
+        if (self._hex_span[1] - self._hex_span[2]) % 2 == 0 or not focused:
+            self._reparse_hex_span()
+        if not focused:
+            self._finish_hex_edit()
+
+    def _reparse_hex_span(self):
+        first, end, old_end = self._hex_span
+        self._hex_span = None
+        digits = self.binary_text.HexDigits()
+        first //= 2
+        if (end - old_end) % 2:
+            end, old_end = len(digits) // 2, len(self._data)
+        else:
+            shift = (end - old_end) // 2
+            end = min((end + 1) // 2, len(digits) // 2)
+            old_end = end - shift
+        data = self._data[:first] + bytes.fromhex(digits[2 * first:2 * end]) + self._data[old_end:]
         self._updating = True
-        binary_data = self._get_raw_hex()
         try:
-            self.tree.model().clear()
-            self.tree.model().setHorizontalHeaderLabels(["Command", "Value"])
-            self.commands = BinaryFileViewer.parse_moveset_file(binary_data)
-            for comm in self.commands:
-                self.tree.model().appendRow(self._build_tree_item(comm))
-            self.tree.resizeColumnToContents(0)
+            start, stop, comms, offsets = Command.DiffMoveset(
+                self.commands, self._offsets, self._data, data)
+            delta = len(data) - len(self._data)
+            self._data = data
+            if stop > start or comms:
+                # Undo deltas were recorded against the replaced commands.
+                self.undo_stack.clear()
+                if not self.tree_model.ReplaceCommands(start, stop - start, comms) and comms:
+                    self._column_stale = True
+            self._offsets[start:stop] = offsets
+            if delta:
+                tail = start + len(offsets)
+                self._offsets[tail:] = [o + delta for o in self._offsets[tail:]]
         except Exception:
             traceback.print_exc()
         finally:
             self._updating = False
 
-        if not self.binary_text.hasFocus():
-            self._refresh_hex_display()
+    def _finish_hex_edit(self):
+        # A lone digit left in is read the way the text reads: as shifting
+        # everything after it.
+        if self._hex_span is not None:
+            self._reparse_hex_span()
+        if self._column_stale:
+            # Fitting the column reads every row, so not per keystroke.
+            self._column_stale = False
+            self.tree.resizeColumnToContents(0)
+        self._refresh_hex_display()
+
+    def _sync_data_from_commands(self):
+        """Re-derive self._data and self._offsets after the command list was
+        edited through the tree, so the next hex edit diffs against it."""
+        offsets, pos = [], 0
+        for comm in self.commands:
+            offsets.append(pos)
+            pos += comm.command_size // 2
+        self._data = bytes(Command.EncodeMoveset(self.commands))
+        self._offsets = offsets
+        self._data_stale = False
+
+    # ── Delta application (see the *Delta undo commands) ──────────────
+
+    def _insert_commands(self, row: int, comms: list):
+        self._updating = True
+        try:
+            self.tree_model.InsertCommands(row, comms)
+        finally:
+            self._updating = False
+        self.binary_text.ReplaceCommands(row, 0, comms)
+        self._after_delta(row)
+
+    def _remove_commands(self, row: int, count: int) -> list:
+        self._updating = True
+        try:
+            removed = self.tree_model.RemoveCommands(row, count)
+        finally:
+            self._updating = False
+        self.binary_text.ReplaceCommands(row, count, [])
+        self._after_delta(min(row, len(self.commands) - 1))
+        return removed
+
+    def _move_command(self, src: int, dst: int):
+        self._updating = True
+        try:
+            self.tree_model.MoveCommand(src, dst)
+        finally:
+            self._updating = False
+        self.binary_text.ReplaceCommands(src, 1, [])
+        self.binary_text.ReplaceCommands(dst, 0, [self.commands[dst]])
+        self._after_delta(dst)
+
+    def _set_field(self, row: int, name: str, value):
+        comm = self.commands[row]
+        field_row = next(i for i, (k, _) in enumerate(comm.GetFields()) if k == name)
+        attr = getattr(comm, name)
+        self._updating = True
+        try:
+            attr.SetValue(value)
+            self.tree_model.FieldChanged(row, field_row)
+        finally:
+            self._updating = False
+        self.binary_text.ReplaceCommands(row, 1, [comm])
+        self._after_delta(row)
+
+    def _after_delta(self, row: int):
+        """Select `row` once the hex view has been patched; _data/_offsets are only
+        re-derived when something needs them (see _sync_data_from_commands)."""
+        self._data_stale = True
+        if 0 <= row < len(self.commands):
+            # Guarded so on_tree_selection_changed does not redraw as well.
+            self._updating = True
+            try:
+                index = self.tree_model.index(row, 0)
+                self.tree.selectionModel().setCurrentIndex(
+                    index, QItemSelectionModel.SelectionFlag.ClearAndSelect |
+                           QItemSelectionModel.SelectionFlag.Rows)
+            finally:
+                self._updating = False
+        self._select_in_hex(row)
+
+    def _on_field_edited(self, index, value):
+        row = index.parent().row()
+        comm = self.commands[row]
+        name, attr = comm.GetFields()[index.row()]
+        if attr.value != value:
+            self.undo_stack.push(SetFieldDelta(self, row, name, attr.value, value))
 
     def export_data(self):
         if self._updating:
             return
-        self.commands = []
-        for row in range(self.tree.model().rowCount()):
-            item = self.tree.model().item(row, 0)
-            if item and item.data():
-                self.commands.append(item.data())
+        self._sync_data_from_commands()
         self._refresh_hex_display()
 
     def on_tree_data_changed(self, topLeft, bottomRight, roles=None):
         if self._updating:
             return
         self.export_data()
-        row = topLeft.parent().row() if topLeft.parent().isValid() else topLeft.row()
-        self._update_parent_label(row)
-
-    def _update_parent_label(self, row: int):
-        item = self.tree.model().item(row, 0)
-        if not item:
-            return
-        comm = item.data()
-        if comm is None:
-            return
-        summary = get_command_summary(comm)
-        item.setText(f"{comm._hex[0:2].upper()}  {comm.command_name}{summary}")
 
     # ── Tooltip ───────────────────────────────────────────────────────
 
@@ -467,35 +1257,12 @@ class BinaryFileViewer(QMainWindow):
         if idx < 0 or idx >= len(self.commands):
             QToolTip.hideText()
             return
-        cmd = self.commands[idx]
-        accent, _ = get_command_color(cmd)
-        rows_html = ""
-        for k, v in cmd.__dict__.items():
-            if k.startswith('_'):
-                continue
-            if isinstance(v, DataType.BASE_TYPE):
-                label = v.GetLabel() if v.template else str(v.value)
-                rows_html += (
-                    f"<tr>"
-                    f"<td style='padding:2px 10px 2px 0;'><i>{k}</i></td>"
-                    f"<td style='padding:2px 0;'><b>{label}</b></td>"
-                    f"</tr>"
-                )
-        table = f"<table>{rows_html}</table>" if rows_html else ""
-        tip = (
-            f"<html>"
-            f"<b>{cmd.command_name}</b>"
-            f"&nbsp;&nbsp;<span style='color:#aaaaaa;font-size:10px;'>{cmd._hex[0:2].upper()}</span>"
-            f"<hr style='margin:4px 0;'>"
-            f"{table}"
-            f"</html>"
-        )
-        QToolTip.showText(QCursor.pos(), tip, self.binary_text)
+        QToolTip.showText(QCursor.pos(), self.tree_model.Tooltip(idx), self.binary_text)
 
     def on_hex_command_clicked(self, idx: int):
         """Select the corresponding tree row when a hex block is clicked."""
-        if 0 <= idx < self.tree.model().rowCount():
-            index = self.tree.model().index(idx, 0)
+        if 0 <= idx < len(self.commands):
+            index = self.tree_model.index(idx, 0)
             self.tree.selectionModel().setCurrentIndex(
                 index, QItemSelectionModel.SelectionFlag.ClearAndSelect |
                        QItemSelectionModel.SelectionFlag.Rows)
@@ -509,7 +1276,7 @@ class BinaryFileViewer(QMainWindow):
             return
         idx = indexes[0]
         row = idx.parent().row() if idx.parent().isValid() else idx.row()
-        self._refresh_hex_display(selected_idx=row)
+        self._select_in_hex(row)
 
     # ── Toolbar actions ───────────────────────────────────────────────
 
@@ -528,50 +1295,38 @@ class BinaryFileViewer(QMainWindow):
             top_row = selected.parent().row() if selected.parent().isValid() else selected.row()
             insert_row = top_row + 1
         else:
-            insert_row = self.tree.model().rowCount()
+            insert_row = len(self.commands)
 
-        self.tree.model().insertRow(insert_row, [self._build_tree_item(comm)])
-        self.export_data()
+        self.undo_stack.push(InsertCommandDelta(self, insert_row, comm))
 
     def delete_selected_command(self):
         selected = self.tree.selectionModel().currentIndex()
         if not selected.isValid():
             return
         row = selected.parent().row() if selected.parent().isValid() else selected.row()
-        self.tree.model().removeRow(row)
-        self.export_data()
+        self.undo_stack.push(RemoveCommandDelta(self, row))
 
     def move_command_up(self):
         idx = self.tree.selectionModel().currentIndex()
         if not idx.isValid():
             return
         if idx.parent().isValid():
-            idx = self.tree.model().indexFromItem(self.tree.model().itemFromIndex(idx.parent()))
+            idx = idx.parent()
         row = idx.row()
         if row <= 0:
             return
-        item = self.tree.model().takeRow(row)[0]
-        self.tree.model().insertRow(row - 1, item)
-        new = self.tree.model().index(row - 1, 0)
-        self.tree.selectionModel().setCurrentIndex(
-            new, QItemSelectionModel.SelectionFlag.ClearAndSelect | QItemSelectionModel.SelectionFlag.Rows)
-        self.export_data()
+        self.undo_stack.push(MoveCommandDelta(self, row, row - 1))
 
     def move_command_down(self):
         idx = self.tree.selectionModel().currentIndex()
         if not idx.isValid():
             return
         if idx.parent().isValid():
-            idx = self.tree.model().indexFromItem(self.tree.model().itemFromIndex(idx.parent()))
+            idx = idx.parent()
         row = idx.row()
-        if row >= self.tree.model().rowCount() - 1:
+        if row >= len(self.commands) - 1:
             return
-        item = self.tree.model().takeRow(row)[0]
-        self.tree.model().insertRow(row + 1, item)
-        new = self.tree.model().index(row + 1, 0)
-        self.tree.selectionModel().setCurrentIndex(
-            new, QItemSelectionModel.SelectionFlag.ClearAndSelect | QItemSelectionModel.SelectionFlag.Rows)
-        self.export_data()
+        self.undo_stack.push(MoveCommandDelta(self, row, row + 1))
 
     # ── File I/O ──────────────────────────────────────────────────────
 
@@ -579,37 +1334,150 @@ class BinaryFileViewer(QMainWindow):
         file_path, _ = QFileDialog.getOpenFileName(
             self, "Open Binary File", "", "Binary Files (*.bin);;All Files (*)")
         if file_path:
-            with open(file_path, "rb") as f:
-                self.binary_text.setPlainText(f.read().hex().upper())
+            self.load_file(file_path)
+
+    def load_file(self, file_path: str):
+        """Decode `file_path` on a worker thread. Commands are appended to the
+        tree batch by batch; the hex view is filled in once loading ends."""
+        if self._loader is not None:
+            self._loader.Cancel()
+        elif self._data_stale:
+            self._sync_data_from_commands()
+        if self._before_load is None:
+            self._before_load = (self.commands, self._data, self._offsets)
+
+        loader = self._loader = MovesetLoader(file_path)
+        loader.setAutoDelete(False)
+        loader.signals.batch.connect(self._on_load_batch)
+        loader.signals.progress.connect(self._on_load_progress)
+        loader.signals.finished.connect(self._on_load_finished)
+        loader.signals.failed.connect(self._on_load_failed)
+
+        self.commands = []
+        self._hex_span = None
+        self.binary_text.blockSignals(True)
+        self.binary_text.clear()
+        self.binary_text.blockSignals(False)
+        self.binary_text.display_mode = False
+        self._set_loading(True)
+        self.load_progress.setRange(0, 0)
+        self.statusBar().showMessage(f"Loading {os.path.basename(file_path)}...")
+        QThreadPool.globalInstance().start(loader)
+
+    def cancel_load(self):
+        """Stop the running load and put back the script shown before it."""
+        if self._loader is None:
+            return
+        self._loader.Cancel()
+        self._loader = None
+        commands, self._data, self._offsets = self._before_load
+        self._before_load = None
+        self.commands = commands
+        self._set_loading(False)
+        self._refresh_hex_display()
+        self.statusBar().showMessage("Loading cancelled", 5000)
+
+    def _from_current_load(self) -> bool:
+        # Signals of a cancelled or superseded loader may still be queued.
+        return self._loader is not None and self.sender() is self._loader.signals
+
+    def _on_load_batch(self, batch: list):
+        if self._from_current_load():
+            self.tree_model.InsertCommands(len(self.commands), batch)
+            # Lay the rows out now, while the worker is parked.
+            self.tree.doItemsLayout()
+            self._loader.BatchTaken()
+
+    def _on_load_progress(self, done: int, total: int):
+        if self._from_current_load():
+            self.load_progress.setRange(0, max(total, 1))
+            self.load_progress.setValue(done)
+
+    def _on_load_finished(self, result: LoadResult):
+        if not self._from_current_load():
+            return
+        self._loader = None
+        self._data, self._offsets, self._data_stale = result.data, result.offsets, False
+        # Row numbers held by undo deltas belong to the previous script.
+        self.undo_stack.clear()
+        self.tree.resizeColumnToContents(0)
+        self._before_load = None
+        self._set_loading(False)
+        if self.commands:
+            self.binary_text.ShowDocument(result.document, result.colors)
+        self.statusBar().showMessage(f"Loaded {len(self.commands)} commands", 5000)
+
+    def _on_load_failed(self, message: str):
+        if self._from_current_load():
+            self.cancel_load()
+            QMessageBox.critical(self, "Open Error", message)
+
+    def _set_loading(self, loading: bool):
+        for control in self._edit_controls:
+            control.setEnabled(not loading)
+        if not loading:
+            self.undo_action.setEnabled(self.undo_stack.canUndo())
+            self.redo_action.setEnabled(self.undo_stack.canRedo())
+        self.binary_text.setReadOnly(loading)
+        self.tree.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers if loading
+                                  else self._edit_triggers)
+        self.load_progress.setVisible(loading)
+        self.load_cancel.setVisible(loading)
+
+    def closeEvent(self, event):
+        if self._loader is not None:
+            self._loader.Cancel()
+        super().closeEvent(event)
 
     def save_file(self):
         file_path, _ = QFileDialog.getSaveFileName(
             self, "Save Binary File", "", "Binary Files (*.bin);;All Files (*)")
         if file_path:
-            hex_str = self._get_raw_hex()
+            # Encode from the command list; bytes past the last complete
+            # command (a half-typed one) are written back unchanged.
+            if self._data_stale:
+                self._sync_data_from_commands()
+            parsed_end = self._offsets[-1] + self.commands[-1].command_size // 2 if self.commands else 0
             try:
                 with open(file_path, "wb") as f:
-                    f.write(bytes.fromhex(hex_str))
-            except ValueError as e:
-                QMessageBox.critical(self, "Save Error", f"Invalid hex data: {e}")
+                    f.write(Command.EncodeMoveset(self.commands))
+                    f.write(self._data[parsed_end:])
+            except OSError as e:
+                QMessageBox.critical(self, "Save Error", f"Could not write file: {e}")
+
+    def compare_with_file(self):
+        """Diff a file on disk (a) against the script being edited (b)."""
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "Compare With File", "", "Binary Files (*.bin);;All Files (*)")
+        if not file_path:
+            return
+        try:
+            with open(file_path, "rb") as f:
+                other = Command.ParseMoveset(f.read())
+        except OSError as e:
+            QMessageBox.critical(self, "Compare Error", f"Could not read file: {e}")
+            return
+        ops = MovesetDiff.DiffMovesets(other, self.commands)
+        lines = MovesetDiff.FormatDiff(other, self.commands, ops)
+        if all(op.tag == 'equal' for op in ops):
+            lines = ["No differences."]
+
+        dialog = QDialog(self)
+        dialog.setWindowTitle(f"Diff: {file_path} → current")
+        dialog.resize(760, 520)
+        view = QPlainTextEdit(dialog)
+        view.setReadOnly(True)
+        view.setFont(QFontDatabase.systemFont(QFontDatabase.SystemFont.FixedFont))
+        view.setPlainText("\n".join(lines))
+        QVBoxLayout(dialog).addWidget(view)
+        dialog.show()
 
     # ── Parser ────────────────────────────────────────────────────────
 
     @staticmethod
     def parse_moveset_file(moveset: str) -> List[Command.BaseCommand]:
-        commands = []
-        pos = 0
-        while pos < len(moveset):
-            hx = moveset[pos:pos+2].upper()
-            commclass = Command.GetCommand(hx)
-            if pos + commclass.command_size > len(moveset):
-                break
-            comm = commclass(moveset[pos:pos+commclass.command_size])
-            if isinstance(comm, Command.UNKNOWN):
-                comm.command_name = hx
-            commands.append(comm)
-            pos += commclass.command_size
-        return commands
+        """Hex-string adapter around Command.ParseMoveset; a trailing odd nibble is ignored."""
+        return Command.ParseMoveset(bytes.fromhex(moveset[:len(moveset) & ~1]))
 
 
 def main():
@@ -627,6 +1495,9 @@ def main():
     viewer.show()
 
     res = DataType.LoadRemixStuff()
+    if res:
+        # Labels rendered before the Remix IDs were known are stale.
+        viewer.tree_model.ClearTextCache()
     if res is False:
         QMessageBox.warning(
             viewer, "Warning",
@@ -0,0 +1,230 @@
+"""Structural diff between two decoded moveset scripts.
+
+Commands are compared by their encoded bytes. The sequences are aligned
+patience-style: commands that occur exactly once in both scripts anchor the
+alignment (longest increasing run of anchors), and the stretches between
+anchors are aligned the same way recursively, falling back to difflib for
+small stretches with no unique commands. Inside each unmatched stretch,
+commands of the same class are paired up and reported as field changes
+(HITBOX.damage 12 → 14); the rest are insertions and deletions.
+
+    python MovesetDiff.py old.bin new.bin
+    python MovesetDiff.py old_dir/ new_dir/     # every .bin present in both
+"""
+import argparse
+import difflib
+import os
+import sys
+from bisect import bisect_left
+from collections import Counter
+from typing import NamedTuple
+
+import Command
+
+
+class FieldChange(NamedTuple):
+    field: str           # field name, or 'raw' when only undeclared bits differ
+    old: object
+    new: object
+
+
+class DiffOp(NamedTuple):
+    tag: str             # 'equal', 'insert', 'delete' or 'change'
+    a_lo: int
+    a_hi: int
+    b_lo: int
+    b_hi: int
+    fields: tuple = ()   # FieldChange tuples for 'change'
+
+
+# Stretches without unique commands are handed to difflib only up to this
+# many (len(a) * len(b)) comparisons; bigger ones are left unmatched.
+_DIFFLIB_LIMIT = 250000
+
+
+def _longest_increasing(pairs) -> list:
+    """Longest subsequence of (i, j) pairs, already sorted by i, whose j also
+    increase (patience sorting, O(k log k))."""
+    tails, tail_idx, prev = [], [], [None] * len(pairs)
+    for k, (_, j) in enumerate(pairs):
+        pos = bisect_left(tails, j)
+        if pos == len(tails):
+            tails.append(j)
+            tail_idx.append(k)
+        else:
+            tails[pos] = j
+            tail_idx[pos] = k
+        prev[k] = tail_idx[pos - 1] if pos else None
+    out = []
+    k = tail_idx[-1] if tail_idx else None
+    while k is not None:
+        out.append(pairs[k])
+        k = prev[k]
+    out.reverse()
+    return out
+
+
+def AlignKeys(a, b) -> list:
+    """Matched (i, j) index pairs between two key sequences, ascending."""
+    matched = []
+    regions = [(0, len(a), 0, len(b))]
+    while regions:
+        alo, ahi, blo, bhi = regions.pop()
+        while alo < ahi and blo < bhi and a[alo] == b[blo]:
+            matched.append((alo, blo))
+            alo += 1
+            blo += 1
+        while alo < ahi and blo < bhi and a[ahi - 1] == b[bhi - 1]:
+            ahi -= 1
+            bhi -= 1
+            matched.append((ahi, bhi))
+        if alo == ahi or blo == bhi:
+            continue
+
+        count_a = Counter(a[alo:ahi])
+        count_b = Counter(b[blo:bhi])
+        b_pos = {b[j]: j for j in range(blo, bhi) if count_b[b[j]] == 1}
+        candidates = [(i, b_pos[a[i]]) for i in range(alo, ahi)
+                      if count_a[a[i]] == 1 and a[i] in b_pos]
+        anchors = _longest_increasing(candidates)
+        if anchors:
+            matched.extend(anchors)
+            pi, pj = alo, blo
+            for i, j in anchors:
+                regions.append((pi, i, pj, j))
+                pi, pj = i + 1, j + 1
+            regions.append((pi, ahi, pj, bhi))
+        elif (ahi - alo) * (bhi - blo) <= _DIFFLIB_LIMIT:
+            sm = difflib.SequenceMatcher(None, a[alo:ahi], b[blo:bhi], autojunk=False)
+            for i, j, size in sm.get_matching_blocks():
+                matched.extend((alo + i + k, blo + j + k) for k in range(size))
+    matched.sort()
+    return matched
+
+
+def _field_changes(old, new) -> tuple:
+    changes = tuple(FieldChange(name, value.value, getattr(new, name).value)
+                    for name, value in old.GetFields()
+                    if value.value != getattr(new, name).value)
+    if not changes:
+        # Same fields, different bytes: only bits no field covers changed.
+        changes = (FieldChange('raw', old.ToHex(), new.ToHex()),)
+    return changes
+
+
+def _diff_gap(a_cmds, b_cmds, alo, ahi, blo, bhi, ops):
+    """Ops for an unmatched stretch: same-class commands become 'change'."""
+    a_cls = [type(c).__name__ for c in a_cmds[alo:ahi]]
+    b_cls = [type(c).__name__ for c in b_cmds[blo:bhi]]
+    if len(a_cls) * len(b_cls) <= _DIFFLIB_LIMIT:
+        blocks = difflib.SequenceMatcher(None, a_cls, b_cls, autojunk=False).get_matching_blocks()
+    else:
+        # Too big to align: the whole stretch is deleted and reinserted.
+        blocks = [(len(a_cls), len(b_cls), 0)]
+    pi, pj = 0, 0
+    for i, j, size in blocks:
+        if i > pi:
+            ops.append(DiffOp('delete', alo + pi, alo + i, blo + pj, blo + pj))
+        if j > pj:
+            ops.append(DiffOp('insert', alo + i, alo + i, blo + pj, blo + j))
+        for k in range(size):
+            ai, bj = alo + i + k, blo + j + k
+            ops.append(DiffOp('change', ai, ai + 1, bj, bj + 1, _field_changes(a_cmds[ai], b_cmds[bj])))
+        pi, pj = i + size, j + size
+
+
+def DiffMovesets(a_cmds, b_cmds) -> list:
+    """DiffOp list turning command list `a_cmds` into `b_cmds`. Runs of
+    identical commands are merged into single 'equal' ops."""
+    a_keys = [c.ToBytes() for c in a_cmds]
+    b_keys = [c.ToBytes() for c in b_cmds]
+    ops = []
+    pi, pj = 0, 0
+    for i, j in AlignKeys(a_keys, b_keys) + [(len(a_keys), len(b_keys))]:
+        if i > pi or j > pj:
+            _diff_gap(a_cmds, b_cmds, pi, i, pj, j, ops)
+        if i < len(a_keys):
+            last = ops[-1] if ops else None
+            if last and last.tag == 'equal' and last.a_hi == i and last.b_hi == j:
+                ops[-1] = last._replace(a_hi=i + 1, b_hi=j + 1)
+            else:
+                ops.append(DiffOp('equal', i, i + 1, j, j + 1))
+        pi, pj = i + 1, j + 1
+    return ops
+
+
+def DiffBytes(a_data, b_data) -> tuple:
+    """Parse two scripts and diff them: (a_cmds, b_cmds, ops)."""
+    a_cmds = Command.ParseMoveset(a_data)
+    b_cmds = Command.ParseMoveset(b_data)
+    return a_cmds, b_cmds, DiffMovesets(a_cmds, b_cmds)
+
+
+def _label(cls, field, value):
+    for f in cls.fields:
+        if f.name == field and f.dtype.template is not None:
+            label = f.dtype.template.Label(value)
+            return value if label is None else label
+    return value
+
+
+def FormatDiff(a_cmds, b_cmds, ops) -> list:
+    """Human-readable lines for a diff; unchanged runs are summarised."""
+    lines = []
+    for op in ops:
+        if op.tag == 'equal':
+            lines.append(f"  = {op.a_hi - op.a_lo} unchanged")
+        elif op.tag == 'delete':
+            for i in range(op.a_lo, op.a_hi):
+                lines.append(f"  - a{i:<5} {a_cmds[i].command_name}  {a_cmds[i].ToHex()}")
+        elif op.tag == 'insert':
+            for j in range(op.b_lo, op.b_hi):
+                lines.append(f"  + b{j:<5} {b_cmds[j].command_name}  {b_cmds[j].ToHex()}")
+        else:
+            cls = type(a_cmds[op.a_lo])
+            changes = ", ".join(f"{cls.__name__}.{c.field} {_label(cls, c.field, c.old)} → "
+                                f"{_label(cls, c.field, c.new)}" for c in op.fields)
+            lines.append(f"  ~ a{op.a_lo}/b{op.b_lo}  {changes}")
+    return lines
+
+
+def _pairs(old, new):
+    if not (os.path.isdir(old) and os.path.isdir(new)):
+        yield old, old, new
+        return
+    import BatchTool
+    old_files = {os.path.relpath(p, old) for p in BatchTool.FindMovesetFiles(old)}
+    new_files = {os.path.relpath(p, new) for p in BatchTool.FindMovesetFiles(new)}
+    for rel in sorted(old_files | new_files):
+        yield rel, (os.path.join(old, rel) if rel in old_files else None), \
+            (os.path.join(new, rel) if rel in new_files else None)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show command-level differences between moveset files.")
+    parser.add_argument("old", help="file or directory")
+    parser.add_argument("new", help="file or directory")
+    args = parser.parse_args(argv)
+
+    differs = False
+    for name, old_path, new_path in _pairs(args.old, args.new):
+        if old_path is None or new_path is None:
+            print(f"{'+' if old_path is None else '-'} {name}")
+            differs = True
+            continue
+        with open(old_path, "rb") as f:
+            a_data = f.read()
+        with open(new_path, "rb") as f:
+            b_data = f.read()
+        if a_data == b_data:
+            continue
+        a_cmds, b_cmds, ops = DiffBytes(a_data, b_data)
+        print(f"~ {name}")
+        for line in FormatDiff(a_cmds, b_cmds, ops):
+            print(line)
+        differs = True
+    return 1 if differs else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
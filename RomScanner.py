@@ -0,0 +1,141 @@
+"""Locate moveset scripts inside a full SSB64 ROM or decompressed character file.
+
+The file is memory-mapped and read in place. Every word-aligned offset is
+tried as a script start. A candidate is accepted when it decodes into a chain
+of known commands whose unused bits are all zero and which ends in
+MOVESET_END, GOTO or RETURN. Only big-endian (.z64) images are understood.
+"""
+import argparse
+import mmap
+import os
+import struct
+import sys
+from typing import NamedTuple
+
+import Command
+
+
+class ScriptCandidate(NamedTuple):
+    offset: int          # byte offset of the first command
+    length: int          # bytes up to and including the terminating command
+    command_count: int
+    confidence: float    # 0..1, see _confidence
+
+
+# Commands a script may end with: a plain end, a loop back (GOTO) or the end
+# of a subroutine body (RETURN).
+_TERMINATORS = frozenset((Command.MOVESET_END, Command.GOTO, Command.RETURN))
+_TIMING = frozenset((Command.WAIT, Command.AFTER))
+
+# Bits of HITBOX word 0 that hold the group id, which has no Field.
+_UNDECLARED_BITS = {Command.HITBOX: 0x00700000}
+
+
+def _reserved_masks(cls, remix: bool) -> tuple:
+    """Per-word masks of the bits that no field or the opcode covers and that
+    a genuine command therefore leaves zero."""
+    owned = [0] * (cls.command_size // 8)
+    owned[0] = (0xFF000000 if remix else 0xFC000000) | _UNDECLARED_BITS.get(cls, 0)
+    for f in cls.fields:
+        owned[f.word] |= ((1 << f.width) - 1) << f.shift
+    return tuple(~m & 0xFFFFFFFF for m in owned)
+
+
+def _build_rules() -> list:
+    """First byte → (class, size in bytes, word struct, reserved masks), or
+    None for bytes that do not start a known command."""
+    rules = []
+    for first_byte, entry in enumerate(Command.OPCODE_TABLE):
+        if entry.cls is Command.UNKNOWN:
+            rules.append(None)
+            continue
+        masks = _reserved_masks(entry.cls, remix=first_byte >= 0xD0)
+        rules.append((entry.cls, entry.byte_size, struct.Struct(f'>{len(masks)}I'), masks))
+    return rules
+
+
+_RULES = _build_rules()
+_WORD = struct.Struct('>I')
+
+
+def _walk(data, pos, end, max_commands):
+    """Follow the command chain from `pos`. Returns (end_offset, count,
+    distinct_classes, has_timing) if it reaches a terminator, else None."""
+    rules = _RULES
+    count = 0
+    seen = set()
+    while count < max_commands and pos < end:
+        rule = rules[data[pos]]
+        if rule is None:
+            return None
+        cls, size, words, masks = rule
+        if pos + size > end:
+            return None
+        for w, m in zip(words.unpack_from(data, pos), masks):
+            if w & m:
+                return None
+        count += 1
+        seen.add(cls)
+        pos += size
+        if cls in _TERMINATORS:
+            return pos, count, len(seen), not _TIMING.isdisjoint(seen)
+    return None
+
+
+def _confidence(count, distinct, has_timing) -> float:
+    """Longer, more varied chains with timing commands look like real scripts;
+    short runs of one command type are usually coincidence."""
+    score = 0.5 * min(1.0, count / 10) + 0.2 * min(1.0, distinct / 4)
+    if has_timing:
+        score += 0.3
+    return round(score, 3)
+
+
+def ScanBuffer(data, min_commands=3, min_confidence=0.0, max_commands=4096) -> list:
+    """Find candidate moveset scripts in a bytes-like object (bytes, mmap,
+    memoryview). Candidates never overlap: scanning resumes after each one."""
+    end = len(data)
+    rules = _RULES
+    first_word = _WORD.unpack_from
+    found = []
+    pos = 0
+    while pos + 4 <= end:
+        # Cheap rejection on the first word before walking a chain.
+        rule = rules[data[pos]]
+        if rule is None or first_word(data, pos)[0] & rule[3][0]:
+            pos += 4
+            continue
+        hit = _walk(data, pos, end, max_commands)
+        if hit is not None and hit[1] >= min_commands:
+            stop, count, distinct, has_timing = hit
+            confidence = _confidence(count, distinct, has_timing)
+            if confidence >= min_confidence:
+                found.append(ScriptCandidate(pos, stop - pos, count, confidence))
+                pos = stop
+                continue
+        pos += 4
+    return found
+
+
+def ScanRom(path, min_commands=3, min_confidence=0.0, max_commands=4096) -> list:
+    """Memory-map `path` and scan it with ScanBuffer without copying it."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return []  # mmap refuses empty files
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return ScanBuffer(mm, min_commands, min_confidence, max_commands)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="List candidate moveset scripts in a ROM or character file.")
+    parser.add_argument("path")
+    parser.add_argument("--min-commands", type=int, default=3)
+    parser.add_argument("--min-confidence", type=float, default=0.5)
+    args = parser.parse_args(argv)
+
+    for c in ScanRom(args.path, args.min_commands, args.min_confidence):
+        print(f"{c.offset:#010x}\t{c.length:#x}\t{c.command_count}\t{c.confidence:.2f}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,243 @@
+"""Step a moveset script frame by frame and record what is active when.
+
+Timing follows the game: WAIT n resumes the script n frames later, AFTER n
+resumes it on frame n of the move (frames count from 1). The script clock
+advances by the frame speed multiplier each frame, so after a
+SET_FRAME_SPEED_MULTIPLIER of 2.0 a WAIT 10 takes 5 frames. Commands run at
+frame k take effect on frame k.
+
+Tracked state: active hitbox ids (HITBOX, CLEAR_HITBOX, END_HITBOX), the
+whole-body hurtbox state (SET_HURTBOX_STATE / SET_ALL_HURTBOX_STATE, the
+latter also dropping per-part overrides), per-part states
+(SET_SPECIFIC_HURTBOX_STATE) and the frame speed multiplier. Control flow
+uses the same resolution as ControlFlow: GOTO/SUBROUTINE/RETURN and nested
+LOOP_START/LOOP_END (0 iterations loops forever). The script stops at
+MOVESET_END, PAUSE_SCRIPT, GO_TO_MOVESET_FILE, a RETURN with nothing to
+return to, or an address that is not a command boundary.
+
+Timeline.end_reason says why the run stopped:
+
+    'MOVESET_END', 'PAUSE_SCRIPT', 'GO_TO_MOVESET_FILE'
+                          the stopping command ran
+    'RETURN'              a RETURN ran with no SUBROUTINE call to return to
+    'unresolved GOTO', 'unresolved SUBROUTINE'
+                          the jump target is not a command boundary
+    'end of data'         execution ran past the last command
+    'max_frames'          the frame limit was reached first
+    'runaway'             too many commands ran within one frame
+
+Frames where nothing changes are never stepped one by one: the timeline is
+stored as spans of identical state, and the simulator jumps straight to the
+frame the script next wakes up on.
+"""
+import math
+from bisect import bisect_right
+from typing import NamedTuple
+
+import Command
+import ControlFlow
+
+
+VULNERABLE = 1
+
+
+class FrameState(NamedTuple):
+    hitboxes: tuple      # active hitbox ids, ascending
+    hurtbox: int         # whole-body HURTBOX_STATE value
+    parts: tuple         # ((part, HURTBOX_STATE value), ...) overrides, by part
+    fsm: float           # frame speed multiplier
+
+
+class Span(NamedTuple):
+    first: int           # first frame (1-based, inclusive)
+    last: int            # last frame (inclusive)
+    state: FrameState
+
+
+class HitboxWindow(NamedTuple):
+    hitbox_id: int
+    first: int
+    last: int
+    command_index: int   # the HITBOX command that created it
+
+
+class Timeline:
+    __slots__ = ('spans', 'windows', 'end_frame', 'end_reason', '_firsts')
+
+    def __init__(self, spans, windows, end_frame, end_reason):
+        self.spans = spans            # tuple of Span covering frames 1..end_frame
+        self.windows = windows        # tuple of HitboxWindow, by first frame
+        self.end_frame = end_frame
+        self.end_reason = end_reason  # see the module docstring for every value
+        self._firsts = [span.first for span in spans]
+
+    def At(self, frame) -> FrameState:
+        if not 1 <= frame <= self.end_frame:
+            raise IndexError(f"frame {frame} outside 1..{self.end_frame}")
+        return self.spans[bisect_right(self._firsts, frame) - 1].state
+
+    def Frames(self):
+        """Yield (frame, FrameState) for every frame."""
+        for span in self.spans:
+            for frame in range(span.first, span.last + 1):
+                yield frame, span.state
+
+    def IntangibleSpans(self, states=(2, 3)) -> list:
+        """(first, last) frame ranges where the whole body is in one of
+        `states` (INVINCIBLE or INTANGIBLE by default)."""
+        ranges = []
+        for span in self.spans:
+            if span.state.hurtbox in states:
+                if ranges and ranges[-1][1] == span.first - 1:
+                    ranges[-1] = (ranges[-1][0], span.last)
+                else:
+                    ranges.append((span.first, span.last))
+        return ranges
+
+
+# Commands that stop the script outright.
+_STOP = frozenset((Command.MOVESET_END, Command.PAUSE_SCRIPT, Command.GO_TO_MOVESET_FILE))
+_EPSILON = 1e-6
+
+
+def Simulate(data, entry_offset=0, max_frames=1000, max_steps=100000) -> Timeline:
+    """Run the script starting at byte `entry_offset` of `data`.
+
+    Stops after `max_frames` frames, or with end_reason 'runaway' if
+    `max_steps` commands run without the clock moving (a loop with no wait).
+    The other end_reason values are listed in the module docstring."""
+    cfg = ControlFlow.BuildCFG(data)
+    commands = cfg.commands
+    index_of = {offset: i for i, offset in enumerate(cfg.offsets)}
+    n = len(commands)
+
+    pc = index_of.get(entry_offset, n)
+    calls, loops = [], []
+    clock = wake = 0.0
+    frame = 1
+    active = {}                 # hitbox id -> (first frame, command index)
+    hurtbox, parts, fsm = VULNERABLE, {}, 1.0
+    spans, windows = [], []
+    state = None
+    end_reason = None
+
+    def close(hitbox_id, last):
+        first, index = active.pop(hitbox_id)
+        if last >= first:
+            windows.append(HitboxWindow(hitbox_id, first, last, index))
+
+    while frame <= max_frames:
+        steps = 0
+        changed = state is None
+        while end_reason is None and clock + _EPSILON >= wake:
+            if pc >= n:
+                end_reason = 'end of data'
+                break
+            steps += 1
+            if steps > max_steps:
+                end_reason = 'runaway'
+                break
+            comm = commands[pc]
+            cls = type(comm)
+            pc += 1
+            if cls is Command.WAIT:
+                wake = clock + comm.time.value
+            elif cls is Command.AFTER:
+                wake = comm.time.value - 1
+            elif cls is Command.HITBOX:
+                hitbox_id = comm.hitbox_id.value
+                if hitbox_id in active:
+                    close(hitbox_id, frame - 1)
+                active[hitbox_id] = (frame, pc - 1)
+                changed = True
+            elif cls is Command.CLEAR_HITBOX:
+                if comm.hitbox_id.value in active:
+                    close(comm.hitbox_id.value, frame - 1)
+                    changed = True
+            elif cls is Command.END_HITBOX:
+                for hitbox_id in list(active):
+                    close(hitbox_id, frame - 1)
+                changed = True
+            elif cls is Command.SET_HURTBOX_STATE:
+                hurtbox = comm.state.value
+                changed = True
+            elif cls is Command.SET_ALL_HURTBOX_STATE:
+                hurtbox = comm.state.value
+                parts = {}
+                changed = True
+            elif cls is Command.SET_SPECIFIC_HURTBOX_STATE:
+                parts[comm.part.value] = comm.state.value
+                changed = True
+            elif cls is Command.SET_FRAME_SPEED_MULTIPLIER:
+                fsm = comm.fsm.value
+                changed = True
+            elif cls is Command.LOOP_START:
+                loops.append([pc, comm.iterations.value])
+            elif cls is Command.LOOP_END:
+                if loops:
+                    loop = loops[-1]
+                    loop[1] -= 1
+                    if loop[1] == 0:
+                        loops.pop()
+                    else:
+                        pc = loop[0]
+            elif cls is Command.GOTO or cls is Command.SUBROUTINE:
+                target = index_of.get(comm.address.value * 4)
+                if target is None:
+                    end_reason = 'unresolved ' + cls.__name__
+                    break
+                if cls is Command.SUBROUTINE:
+                    calls.append(pc)
+                pc = target
+            elif cls is Command.RETURN:
+                if not calls:
+                    end_reason = cls.__name__
+                    break
+                pc = calls.pop()
+            elif cls in _STOP:
+                end_reason = cls.__name__
+                break
+
+        if changed:
+            state = FrameState(tuple(sorted(active)), hurtbox, tuple(sorted(parts.items())), fsm)
+
+        if end_reason is not None:
+            count = 1
+        elif fsm > 0:
+            count = max(1, math.ceil((wake - clock) / fsm - _EPSILON))
+        else:
+            count = max_frames
+        count = min(count, max_frames - frame + 1)
+
+        last = frame + count - 1
+        if spans and spans[-1].state == state:
+            spans[-1] = spans[-1]._replace(last=last)
+        else:
+            spans.append(Span(frame, last, state))
+        frame = last + 1
+        clock += fsm * count
+        if end_reason is not None:
+            break
+    else:
+        end_reason = 'max_frames'
+
+    end_frame = frame - 1
+    for hitbox_id in list(active):
+        close(hitbox_id, end_frame)
+    windows.sort(key=lambda w: (w.first, w.hitbox_id))
+    return Timeline(tuple(spans), tuple(windows), end_frame, end_reason)
+
+
+def SimulateFile(path, options) -> dict:
+    """BatchTool worker: a JSON-able summary of one script's timeline."""
+    with open(path, "rb") as f:
+        data = f.read()
+    timeline = Simulate(data, options.get("entry_offset", 0), options.get("max_frames", 1000))
+    return {
+        "end_frame": timeline.end_frame,
+        "end_reason": timeline.end_reason,
+        "hitboxes": [list(w) for w in timeline.windows],
+        "intangible": [list(r) for r in timeline.IntangibleSpans()],
+        "spans": [[s.first, s.last, list(s.state.hitboxes), s.state.hurtbox, s.state.fsm]
+                  for s in timeline.spans],
+    }
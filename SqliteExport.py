@@ -0,0 +1,128 @@
+"""Export decoded moveset scripts to a SQLite database for ad-hoc SQL.
+
+    python SqliteExport.py DIR out.sqlite
+
+Every command class gets its own table named after the class (HITBOX, WAIT,
+...), with `file`, `seq` (position in the script) and `byte_offset`
+followed by one column per field; fields with a template also get a
+`<field>_label` column. The `commands` table lists every command of every
+file in script order with its class and raw bytes, so per-class tables can be
+joined back to the sequence:
+
+    SELECT c.file, c.seq, h.damage, h.angle
+    FROM commands c JOIN HITBOX h USING (file, seq)
+    WHERE h.effect_label = 'ELECTRIC';
+
+Existing tables of the same names are dropped and rebuilt inside one
+explicit transaction, so a failed export leaves the database as it was. Each
+table is filled with one executemany.
+"""
+import argparse
+import os
+import sqlite3
+import sys
+
+import BatchTool
+import Command
+import DataType
+
+
+def _command_classes() -> list:
+    classes = list(dict.fromkeys(Command.COMMANDS.values()))
+    classes.append(Command.UNKNOWN)
+    return classes
+
+
+def _column_type(f) -> str:
+    return "REAL" if issubclass(f.dtype, DataType.FLOAT32) else "INTEGER"
+
+
+def _table_sql(cls) -> tuple:
+    """(CREATE TABLE, INSERT) statements for one command class."""
+    columns = ['"file" TEXT NOT NULL', '"seq" INTEGER NOT NULL', '"byte_offset" INTEGER NOT NULL']
+    names = ["file", "seq", "byte_offset"]
+    for f in cls.fields:
+        columns.append(f'"{f.name}" {_column_type(f)}')
+        names.append(f.name)
+        if f.dtype.template is not None:
+            columns.append(f'"{f.name}_label" TEXT')
+            names.append(f"{f.name}_label")
+    create = f'CREATE TABLE "{cls.__name__}" ({", ".join(columns)}, PRIMARY KEY ("file", "seq"))'
+    quoted = ", ".join(f'"{n}"' for n in names)
+    insert = f'INSERT INTO "{cls.__name__}" ({quoted}) VALUES ({", ".join("?" * len(names))})'
+    return create, insert
+
+
+def _row(comm, file, seq, offset) -> tuple:
+    row = [file, seq, offset]
+    for name, value in comm.GetFields():
+        row.append(value.value)
+        if value.template is not None:
+            row.append(value.GetLabel())
+    return tuple(row)
+
+
+def ExportSqlite(paths, db_path, root=None) -> dict:
+    """Decode every file in `paths` into `db_path`. File names are stored
+    relative to `root` when given. Returns the row count per table."""
+    classes = _command_classes()
+    statements = {cls: _table_sql(cls) for cls in classes}
+    rows = {cls: [] for cls in classes}
+    sequence = []
+
+    for path in paths:
+        with open(path, "rb") as f:
+            data = f.read()
+        name = os.path.relpath(path, root) if root else path
+        offset = 0
+        for seq, comm in enumerate(Command.ParseMoveset(data)):
+            size = comm.command_size // 2
+            cls = type(comm)
+            sequence.append((name, seq, offset, cls.__name__, data[offset:offset+size]))
+            rows[cls].append(_row(comm, name, seq, offset))
+            offset += size
+
+    # Autocommit mode with an explicit transaction: the sqlite3 module does
+    # not open one implicitly before DDL, so the DROP/CREATE statements would
+    # otherwise commit on their own.
+    db = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        db.execute("BEGIN")
+        try:
+            db.execute('DROP TABLE IF EXISTS "commands"')
+            db.execute('CREATE TABLE "commands" ("file" TEXT NOT NULL, "seq" INTEGER NOT NULL, '
+                       '"byte_offset" INTEGER NOT NULL, "command" TEXT NOT NULL, "raw" BLOB NOT NULL, '
+                       'PRIMARY KEY ("file", "seq"))')
+            db.executemany('INSERT INTO "commands" VALUES (?, ?, ?, ?, ?)', sequence)
+            for cls in classes:
+                create, insert = statements[cls]
+                db.execute(f'DROP TABLE IF EXISTS "{cls.__name__}"')
+                db.execute(create)
+                db.executemany(insert, rows[cls])
+            db.execute('CREATE INDEX "commands_by_class" ON "commands" ("command")')
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+    finally:
+        db.close()
+
+    counts = {"commands": len(sequence)}
+    counts.update((cls.__name__, len(rows[cls])) for cls in classes if rows[cls])
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export moveset files to a SQLite database.")
+    parser.add_argument("root", help="directory searched recursively for .bin files")
+    parser.add_argument("database")
+    args = parser.parse_args(argv)
+
+    counts = ExportSqlite(BatchTool.FindMovesetFiles(args.root), args.database, args.root)
+    for table, count in counts.items():
+        print(f"{table}\t{count}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+"""Apply a field update to every matching command across many moveset files.
+
+A transform names a command class, an optional `where` predicate and one or
+more `field = expression` updates. Expressions are plain Python evaluated
+against the command's field values (as numbers) plus the labels of the
+templates those fields use, so a balance pass reads:
+
+    python BatchTool.py transform DIR --command HITBOX \\
+        --where "effect == ELECTRIC" --set "base_knockback = base_knockback * 1.1"
+
+A bare label only works when it means the same value for every field of the
+class that knows it; otherwise qualify it with its type, as in
+`sound_type == SOUND_TYPE.SLASH` (HITBOX's effect has a SLASH of its own).
+Every name is checked when the transform is compiled, before any file is read.
+
+Integer fields are rounded, and a value that does not fit its field makes
+that file fail rather than being silently truncated. Files are only
+rewritten when at least one command's bytes changed.
+"""
+import ast
+from types import SimpleNamespace
+from typing import NamedTuple
+import Command
+import DataType
+
+
+class FieldTransform(NamedTuple):
+    command: str              # command class name, e.g. "HITBOX"
+    where: str = None         # predicate expression, None matches every command
+    updates: tuple = ()       # ((field name, expression), ...)
+
+
+_SAFE_BUILTINS = {
+    "abs": abs, "min": min, "max": max, "round": round,
+    "int": int, "float": float, "True": True, "False": False, "None": None,
+}
+
+
+def ParseUpdate(text) -> tuple:
+    """'field = expression' → (field, expression)."""
+    name, sep, expr = text.partition("=")
+    name, expr = name.strip(), expr.strip()
+    if not sep or not name.isidentifier() or not expr:
+        raise ValueError(f"Expected 'field = expression', got {text!r}")
+    return name, expr
+
+
+class _Compiled:
+    """A FieldTransform checked against its command class, with expressions
+    compiled once and the label namespace built up front."""
+    __slots__ = ('cls', 'where', 'updates', 'fields', 'constants', '_ambiguous')
+
+    def __init__(self, transform: FieldTransform):
+        by_name = {cls.__name__: cls for cls in Command.COMMANDS.values()}
+        cls = by_name.get(transform.command)
+        if cls is None:
+            raise ValueError(f"Unknown command class {transform.command!r}")
+        self.cls = cls
+        self.fields = {f.name: f for f in cls.fields}
+        for name, _ in transform.updates:
+            if name not in self.fields:
+                raise ValueError(f"{cls.__name__} has no field {name!r}")
+
+        # Each template type is a namespace of its labels (SOUND_TYPE.SLASH).
+        # Bare labels are only defined when unambiguous across the class's
+        # fields; field names take precedence over both.
+        constants = dict(_SAFE_BUILTINS)
+        meanings = {}                 # label -> {type name: value}
+        for f in cls.fields:
+            template = f.dtype.template
+            if not template:
+                continue
+            labels = {label: value for label, value in template.items() if label.isidentifier()}
+            constants.setdefault(f.dtype.__name__, SimpleNamespace(**labels))
+            for label, value in labels.items():
+                if label not in self.fields:
+                    meanings.setdefault(label, {})[f.dtype.__name__] = value
+        self._ambiguous = {}
+        for label, by_type in meanings.items():
+            if len(set(by_type.values())) == 1:
+                constants.setdefault(label, next(iter(by_type.values())))
+            else:
+                self._ambiguous[label] = sorted(by_type)
+        self.constants = constants
+
+        self.where = self._Compile(transform.where, "<where>") if transform.where else None
+        self.updates = [(name, self._Compile(expr, f"<set {name}>"))
+                        for name, expr in transform.updates]
+
+    def _Compile(self, expr, where):
+        """Compile an expression after checking that every name in it
+        resolves to a field, a builtin or a label."""
+        tree = ast.parse(expr, where, "eval")
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name):
+                namespace = self.constants.get(node.value.id)
+                if isinstance(namespace, SimpleNamespace) and node.value.id not in self.fields \
+                        and not hasattr(namespace, node.attr):
+                    raise ValueError(f"{node.value.id} has no label {node.attr!r}")
+            elif isinstance(node, ast.Name) and node.id not in self.fields and node.id not in self.constants:
+                if node.id in self._ambiguous:
+                    choices = " or ".join(f"{t}.{node.id}" for t in self._ambiguous[node.id])
+                    raise ValueError(f"{node.id!r} means different values for {self.cls.__name__} "
+                                     f"fields; write {choices}")
+                raise ValueError(f"Unknown name {node.id!r} in {where}")
+        return compile(tree, where, "eval")
+
+    def Apply(self, comm) -> bool:
+        """Update one command in place; True if it matched the predicate."""
+        env = dict(self.constants)
+        env.update((name, value.value) for name, value in comm.GetFields())
+        env["__builtins__"] = {}
+        if self.where is not None and not eval(self.where, env):
+            return False
+        # Every expression sees the values from before this command's updates.
+        new_values = [(name, eval(code, env)) for name, code in self.updates]
+        for name, value in new_values:
+            self._Store(comm, self.fields[name], value)
+        return True
+
+    def _Store(self, comm, f, value):
+        # Values are written straight to .value: SetValue clamps unsigned
+        # types and folds signed ones, which would hide an out-of-range result.
+        target = getattr(comm, f.name)
+        if issubclass(f.dtype, DataType.FLOAT32):
+            target.value = float(value)
+            return
+        value = round(value)
+        if f.signed:
+            low, high = -(1 << (f.width - 1)), (1 << (f.width - 1)) - 1
+        else:
+            low, high = 0, (1 << f.width) - 1
+        if not low <= value <= high:
+            raise ValueError(f"{f.name} = {value} does not fit in {f.width} bits")
+        target.value = value
+
+
+def _ApplyEach(commands, compiled):
+    """Apply a compiled transform to each command in place, yielding
+    (index, changed) for every command the predicate selected."""
+    for i, comm in enumerate(commands):
+        if type(comm) is not compiled.cls:
+            continue
+        before = comm.ToBytes()
+        if compiled.Apply(comm):
+            yield i, comm.ToBytes() != before
+
+
+def ApplyTransform(commands, transform) -> tuple:
+    """Apply `transform` (a FieldTransform) to a parsed command list in place.
+    Returns (matched, changed): how many commands the predicate selected and
+    how many of those now encode differently."""
+    compiled = transform if isinstance(transform, _Compiled) else _Compiled(transform)
+    matched = changed = 0
+    for _, differs in _ApplyEach(commands, compiled):
+        matched += 1
+        changed += differs
+    return matched, changed
+
+
+# Worker processes compile each transform once and reuse it for every file
+# in their share of the batch.
+_compiled_cache = {}
+
+
+def TransformFile(path, options) -> dict:
+    """BatchTool worker: options["transform"] is a FieldTransform; the file is
+    rewritten only if something changed and options["dry_run"] is not set.
+    Only the changed commands are re-encoded, into a copy of the original
+    bytes, so the rest of the file is left exactly as it was."""
+    transform = options["transform"]
+    compiled = _compiled_cache.get(transform)
+    if compiled is None:
+        compiled = _compiled_cache[transform] = _Compiled(transform)
+
+    with open(path, "rb") as f:
+        data = f.read()
+    commands = Command.ParseMoveset(data)
+    offsets, pos = [], 0
+    for comm in commands:
+        offsets.append(pos)
+        pos += comm.command_size // 2
+
+    out = bytearray(data)
+    matched = changed = 0
+    for i, differs in _ApplyEach(commands, compiled):
+        matched += 1
+        if differs:
+            changed += 1
+            commands[i].WriteInto(out, offsets[i])
+    if changed and not options.get("dry_run"):
+        with open(path, "wb") as f:
+            f.write(out)
+    return {"matched": matched, "changed": changed}
@@ -0,0 +1,17 @@
+import Command
+import MovesetDiff
+
+
+def _timers(first_byte, times) -> list:
+    return Command.ParseMoveset(b"".join(bytes([first_byte]) + t.to_bytes(3, "big") for t in times))
+
+
+def test_gap_above_difflib_limit_is_reported():
+    a = _timers(0x04, range(1, 601))     # WAIT
+    b = _timers(0x08, range(1, 601))     # AFTER
+    assert len(a) * len(b) > MovesetDiff._DIFFLIB_LIMIT
+    ops = MovesetDiff.DiffMovesets(a, b)
+    assert [(op.tag, op.a_lo, op.a_hi, op.b_lo, op.b_hi) for op in ops] == [
+        ("delete", 0, 600, 0, 0),
+        ("insert", 600, 600, 0, 600),
+    ]
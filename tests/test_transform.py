@@ -0,0 +1,39 @@
+import pytest
+
+import Benchmark
+import Command
+import Transform
+
+
+def _hitboxes():
+    return [c for c in Command.ParseMoveset(Benchmark.GenerateMoveset(300, mix={"HITBOX": 1}))
+            if type(c) is Command.HITBOX]
+
+
+def test_ambiguous_label_is_rejected():
+    with pytest.raises(ValueError, match="SOUND_TYPE.SLASH"):
+        Transform.ApplyTransform(
+            [], Transform.FieldTransform("HITBOX", "sound_type == SLASH", (("damage", "1"),)))
+
+
+def test_qualified_label_uses_its_own_template():
+    commands = _hitboxes()
+    expected = sum(c.sound_type.value == 5 for c in commands)
+    transform = Transform.FieldTransform("HITBOX", "sound_type == SOUND_TYPE.SLASH", (("damage", "1"),))
+    assert Transform.ApplyTransform(commands, transform)[0] == expected > 0
+
+
+@pytest.mark.parametrize("where, update", [
+    ("effect == NOT_A_LABEL", "damage = 1"),
+    ("sound_type == SOUND_TYPE.NOT_A_LABEL", "damage = 1"),
+    (None, "damage = not_a_field"),
+])
+def test_unknown_names_fail_at_compile_time(where, update):
+    with pytest.raises(ValueError):
+        Transform.ApplyTransform([], Transform.FieldTransform("HITBOX", where, (Transform.ParseUpdate(update),)))
+
+
+def test_out_of_range_value_is_rejected():
+    transform = Transform.FieldTransform("HITBOX", None, (("damage", "damage - 300"),))
+    with pytest.raises(ValueError, match="does not fit"):
+        Transform.ApplyTransform(_hitboxes(), transform)
@@ -0,0 +1,55 @@
+import random
+
+import pytest
+
+pytest.importorskip("PySide6")
+
+import Command
+import Main
+
+
+class _NoSearchList(list):
+    """A command list that fails the test if the model scans it for a row."""
+
+    def index(self, *args):
+        raise AssertionError("CommandTreeModel searched the command list")
+
+
+def _wait(frames):
+    return Command.WAIT(bytes.fromhex("04%06x" % frames))
+
+
+def test_field_rows_follow_their_command_through_edits():
+    model = Main.CommandTreeModel()
+    model.SetCommands(_NoSearchList(_wait(i) for i in range(200)))
+    rng = random.Random(0)
+    for step in range(150):
+        n = len(model.commands)
+        op = rng.randrange(3)
+        if op == 0:
+            model.InsertCommands(rng.randrange(n + 1), [_wait(1000 + step)])
+        elif op == 1 and n > 1:
+            model.RemoveCommands(rng.randrange(n), 1)
+        else:
+            model.MoveCommand(rng.randrange(n), rng.randrange(n))
+        # Show the fields of a few commands, as expanding them in the view would.
+        for row in rng.sample(range(len(model.commands)), 3):
+            model.index(0, 1, model.index(row, 0))
+        for key, (comm, _) in model._by_key.items():
+            row = model.parent(model.createIndex(0, 1, key)).row()
+            assert model.commands[row] is comm
+
+
+def test_same_class_replacement_keeps_rows():
+    model = Main.CommandTreeModel()
+    model.SetCommands([_wait(i) for i in range(5)])
+    field = model.index(0, 1, model.index(2, 0))
+    new = _wait(99)
+    assert model.ReplaceCommands(2, 1, [new])
+    assert model.commands[2] is new
+    assert model.parent(field).row() == 2
+    assert model.data(field) == Main._field_text(new.time)
+
+    end = Command.MOVESET_END(bytes.fromhex("00000000"))
+    assert not model.ReplaceCommands(2, 1, [end])
+    assert model.commands[2] is end